@@ -1,49 +1,187 @@
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 from dotenv import load_dotenv
 import os
 import time
-import random
-import json
+import orjson
+import re
+import socket
+import asyncio
+import hashlib
+import threading
+import httpx
+from selectolax.parser import HTMLParser
+from urllib.parse import quote
+from pathlib import Path
+from contextlib import contextmanager
+from functools import lru_cache
 
 # Load .env credentials
 load_dotenv()
 EMAIL = os.getenv("LINKEDIN_EMAIL")
 PASSWORD = os.getenv("LINKEDIN_PASSWORD")
 
+# Save debugging screenshots (slow full-page PNG encodes) only when asked to
+DEBUG = os.getenv("FIND_CEO_DEBUG") == "1"
+
 # Check if credentials are available
 if not EMAIL or not PASSWORD:
     raise ValueError("LinkedIn credentials not found in .env file. Please set LINKEDIN_EMAIL and LINKEDIN_PASSWORD.")
 
 # Key roles we're looking for (in priority order)
-TARGET_ROLES = [
-    {"category": "leadership", "keywords": ["ceo", "chief executive officer", "founder", "co-founder", "cofounder", "president"]},
-    {"category": "data_ai", "keywords": ["head of data", "data science", "machine learning", "ai", "artificial intelligence", "chief data", "data officer"]},
-    {"category": "recruiting", "keywords": ["talent", "recruit", "hiring", "hr", "human resources", "people operations"]}
+TARGET_ROLES = (
+    ("leadership", ("ceo", "chief executive", "founder", "co-founder", "cofounder", "president", "owner")),
+    ("data_ai", ("head of data", "data science", "machine learning", "ai", "artificial intelligence", "chief data", "data officer")),
+    ("recruiting", ("talent", "recruit", "hiring", "hr", "human resources", "people operations"))
+)
+
+# One precompiled case-insensitive alternation per role category, checked in priority order.
+# A single regex per category beats any() over the keywords, so titles are never lowercased per call.
+_ROLE_PATTERNS = tuple(
+    (category, re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE))
+    for category, keywords in TARGET_ROLES
+)
+
+# Role label for the top contact picked from each category, in reporting order
+KEY_CONTACT_ROLES = {
+    "leadership": "CEO/Founder",
+    "data_ai": "Data/AI Leader",
+    "recruiting": "Recruiter/HR"
+}
+
+# Sort order of role categories, and title boosts within a category (first match wins)
+CATEGORY_PRIORITY = {
+    "leadership": 1,
+    "data_ai": 2,
+    "recruiting": 3,
+    "other": 4
+}
+_TITLE_BOOSTS = [
+    (re.compile("ceo", re.IGNORECASE), 0.5),
+    (re.compile("founder", re.IGNORECASE), 0.4),
+    (re.compile("head of data|chief data", re.IGNORECASE), 0.3),
+    (re.compile("lead", re.IGNORECASE), 0.2)
+]
+
+# Company pages that LinkedIn lists alongside people
+KNOWN_COMPANY_NAMES = ['headway', 'spring health', 'lyra health', 'sub-zero', 'anthropic',
+                       'adobe', 'spotify', 'td securities', 'grow therapy']
+_COMPANY_RE = re.compile("|".join(map(re.escape, KNOWN_COMPANY_NAMES)), re.IGNORECASE)
+
+# Requests the scraper never needs: heavy assets and analytics beacons
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+_ANALYTICS_URL_RE = re.compile(r"doubleclick|googletagmanager|px\.ads")
+
+# Chromium launch settings: headless with the features a scraper doesn't need switched off
+HEADLESS = os.getenv("FIND_CEO_HEADLESS", "true").lower() == "true"
+BROWSER_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-background-networking",
+    "--disable-features=Translate,BackForwardCache"
+]
+
+# How to read people out of LinkedIn page HTML, one entry per page layout:
+# (source, container selector, name selector, title selector)
+PEOPLE_HTML_METHODS = [
+    ("people_card",
+     ".org-people-profile-card, .artdeco-entity-lockup, li.reusable-search__result-container",
+     ".artdeco-entity-lockup__title, .org-people-profile-card__profile-title, .entity-result__title-text a, .app-aware-link",
+     ".artdeco-entity-lockup__subtitle, .org-people-profile-card__profile-position, .entity-result__primary-subtitle"),
+    ("search_result",
+     ".search-result, .reusable-search__result-container, .entity-result",
+     "span.actor-name, .entity-result__title-text a, a.app-aware-link",
+     ".subline-level-1, .entity-result__primary-subtitle"),
+    ("people_you_may_know",
+     ".discover-entity-card, .discover-entity-card__content",
+     ".discover-person-card__name, .EntityLockup-title, h3",
+     ".discover-person-card__occupation, .EntityLockup-subtitle")
 ]
 
-def random_sleep(min_seconds=1, max_seconds=2):
-    """Add random delay to mimic human behavior but shorter to avoid timeouts"""
-    delay = random.uniform(min_seconds, max_seconds)
-    time.sleep(delay)
+# Where LinkedIn redirects anonymous or expired sessions
+_LOGIN_WALL_RE = re.compile(r"^/(authwall|login|checkpoint|uas/login)")
+
+# Elements that signal a page is ready to read
+LOGIN_RESULT_SELECTOR = "nav.global-nav, input#username + div.alert"
+PEOPLE_RESULTS_SELECTOR = (".org-people-profile-card, .artdeco-entity-lockup, .reusable-search__result-container, "
+                           ".entity-result, .search-result, .discover-entity-card")
+
+# Search terms used to surface key people at a company
+SEARCH_TERMS = ["CEO", "founder", "head of data", "recruiter"]
+
+# LinkedIn's internal JSON API (the same endpoints the web app calls)
+VOYAGER_API = "https://www.linkedin.com/voyager/api"
+VOYAGER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+
+# On-disk cache of key contacts per company
+CACHE_DIR = Path(os.getenv("FIND_CEO_CACHE_DIR", "cache"))
+CACHE_TTL = int(os.getenv("FIND_CEO_CACHE_TTL", str(7 * 24 * 3600)))  # 7 days
+
+# LinkedIn session shared by every HTTP client (filled once from the browser's cookies)
+_SESSION_COOKIES = httpx.Cookies()
+_SESSION_HEADERS = {
+    "x-restli-protocol-version": "2.0.0",
+    "accept": "application/vnd.linkedin.normalized+json+2.1",
+    "user-agent": VOYAGER_USER_AGENT
+}
+
+# The persistent Chromium profile can only be opened by one browser at a time, and the login must
+# only happen once, so both are serialized across threads (main.py runs several companies at once)
+_PROFILE_LOCK = threading.RLock()
+_LOGIN_LOCK = threading.Lock()
+
+def new_http_client():
+    """Create a keep-alive HTTP/2 client carrying the LinkedIn session.
+    
+    All requests made through one client multiplex over a single TCP+TLS connection.
+    """
+    return httpx.AsyncClient(
+        cookies=_SESSION_COOKIES,
+        headers=_SESSION_HEADERS,
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]
+        ),
+        timeout=30
+    )
+
+def block_heavy_resources(page):
+    """Abort image/font/media/stylesheet and analytics requests to cut page weight"""
+    def handle_route(route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or _ANALYTICS_URL_RE.search(request.url):
+            route.abort()
+        else:
+            route.continue_()
+    
+    page.route("**/*", handle_route)
+
+def wait_for_people(page, timeout=10000):
+    """Wait until people results are rendered; pages without any just time out quietly"""
+    try:
+        page.wait_for_selector(PEOPLE_RESULTS_SELECTOR, timeout=timeout)
+    except PlaywrightTimeoutError:
+        pass
 
 def login_linkedin(page):
     """Login to LinkedIn"""
     print("🔐 Navigating to LinkedIn login page...")
     page.goto("https://www.linkedin.com/login", timeout=30000)
-    random_sleep()
     
     # Fill in login form
     try:
         print("🧾 Entering credentials...")
         page.fill("input#username", EMAIL)
-        random_sleep()
         page.fill("input#password", PASSWORD)
-        random_sleep()
         page.click("button[type=submit]")
         
-        # Wait for navigation
-        page.wait_for_load_state("networkidle", timeout=20000)
-        random_sleep(2, 3)
+        # Wait for the logged-in nav bar (or the login error alert) rather than network idle,
+        # which LinkedIn's background beacons rarely reach
+        try:
+            page.wait_for_selector(LOGIN_RESULT_SELECTOR, timeout=10000)
+        except PlaywrightTimeoutError:
+            pass
         
         # Check login status
         if page.url.startswith("https://www.linkedin.com/feed"):
@@ -53,11 +191,13 @@ def login_linkedin(page):
             print(f"⚠️ Current URL after login: {page.url}")
             if "challenge" in page.url or "checkpoint" in page.url:
                 print("⚠️ LinkedIn security check detected - manual intervention may be needed")
-                # Wait a bit longer for potential manual intervention
-                time.sleep(15)
-                if page.url.startswith("https://www.linkedin.com/feed"):
+                # Give up to 15 seconds for manual intervention to land on the feed
+                try:
+                    page.wait_for_url("https://www.linkedin.com/feed**", timeout=15000)
                     print("✅ Login successful after security check")
                     return True
+                except PlaywrightTimeoutError:
+                    pass
             
             # Try to continue anyway - sometimes we're logged in despite not being on the feed page
             try:
@@ -73,390 +213,611 @@ def login_linkedin(page):
     except Exception as e:
         print(f"❌ Login error: {str(e)}")
         # Take a screenshot of the login page for debugging
-        try:
-            page.screenshot(path="login_error.png")
-            print("📸 Saved screenshot of login error")
-        except:
-            pass
+        if DEBUG:
+            try:
+                page.screenshot(path="login_error.png")
+                print("📸 Saved screenshot of login error")
+            except:
+                pass
         return False
 
 def get_role_category(title):
     """Determine role category based on title keywords"""
-    title_lower = title.lower()
-    
-    for role in TARGET_ROLES:
-        if any(keyword in title_lower for keyword in role["keywords"]):
-            return role["category"]
+    for category, pattern in _ROLE_PATTERNS:
+        if pattern.search(title):
+            return category
     
     return "other"
 
 def extract_people_data(page):
-    """Extract people data using JavaScript"""
+    """Extract people data from the rendered page HTML"""
     try:
         # Take screenshot for debugging
-        page.screenshot(path="people_page_debug.png")
-        print("📸 Saved screenshot of people page")
+        if DEBUG:
+            page.screenshot(path="people_page_debug.png")
+            print("📸 Saved screenshot of people page")
         
-        # This JavaScript will extract people based on visible UI elements
-        people_data = page.evaluate("""
-            () => {
-                // Keywords to look for in titles
-                const leadershipTitles = ["ceo", "chief executive", "founder", "co-founder", "cofounder", "president", "owner"];
-                const dataTitles = ["head of data", "data science", "machine learning", "ai", "artificial intelligence", "chief data", "data officer"];
-                const recruitingTitles = ["talent", "recruit", "hiring", "hr", "human resources", "people operations"];
-                
-                // Helper function to check if title matches our target categories
-                const getRoleCategory = (title) => {
-                    if (!title) return "other";
-                    const lowerTitle = title.toLowerCase();
-                    
-                    if (leadershipTitles.some(t => lowerTitle.includes(t))) return "leadership";
-                    if (dataTitles.some(t => lowerTitle.includes(t))) return "data_ai";
-                    if (recruitingTitles.some(t => lowerTitle.includes(t))) return "recruiting";
-                    
-                    return "other";
-                };
-                
-                // Look for all people cards and list items
-                const results = [];
-                
-                // Method 1: Find people cards on the people page
-                const peopleCards = Array.from(document.querySelectorAll('.org-people-profile-card, .artdeco-entity-lockup, li.reusable-search__result-container'));
-                console.log(`Found ${peopleCards.length} people cards`);
-                
-                peopleCards.forEach(card => {
-                    try {
-                        // Different selectors for different types of pages
-                        const nameElem = card.querySelector('.artdeco-entity-lockup__title, .org-people-profile-card__profile-title, .entity-result__title-text a, .app-aware-link');
-                        const titleElem = card.querySelector('.artdeco-entity-lockup__subtitle, .org-people-profile-card__profile-position, .entity-result__primary-subtitle');
-                        
-                        if (nameElem && titleElem) {
-                            const name = nameElem.textContent.trim();
-                            const title = titleElem.textContent.trim();
-                            const category = getRoleCategory(title);
-                            const profileUrl = nameElem.href || nameElem.querySelector('a')?.href || '';
-                            
-                            // Only add if it seems like a valid person (not a company)
-                            if (name && title && name !== title) {
-                                results.push({
-                                    name,
-                                    title,
-                                    profileUrl,
-                                    category,
-                                    source: 'people_card'
-                                });
-                            }
-                        }
-                    } catch (e) {
-                        // Ignore individual card errors
-                    }
-                });
-                
-                // Method 2: Look for individual profiles in search results 
-                const searchResults = Array.from(document.querySelectorAll('.search-result, .reusable-search__result-container, .entity-result'));
-                console.log(`Found ${searchResults.length} search results`);
-                
-                searchResults.forEach(result => {
-                    try {
-                        const nameElement = result.querySelector('span.actor-name, .entity-result__title-text a, a.app-aware-link');
-                        const titleElement = result.querySelector('.subline-level-1, .entity-result__primary-subtitle');
-                        
-                        if (nameElement && titleElement) {
-                            const name = nameElement.textContent.trim();
-                            const title = titleElement.textContent.trim();
-                            const category = getRoleCategory(title);
-                            const profileUrl = nameElement.href || nameElement.closest('a')?.href || '';
-                            
-                            if (name && title && name !== title) {
-                                results.push({
-                                    name,
-                                    title,
-                                    profileUrl,
-                                    category,
-                                    source: 'search_result'
-                                });
-                            }
-                        }
-                    } catch (e) {
-                        // Ignore individual result errors
-                    }
-                });
-                
-                // Method 3: Look specifically for "People you may know" section
-                const peopleCards2 = Array.from(document.querySelectorAll('.discover-entity-card, .discover-entity-card__content'));
-                console.log(`Found ${peopleCards2.length} "People you may know" cards`);
-                
-                peopleCards2.forEach(card => {
-                    try {
-                        const nameElement = card.querySelector('.discover-person-card__name, .EntityLockup-title, h3');
-                        const titleElement = card.querySelector('.discover-person-card__occupation, .EntityLockup-subtitle');
-                        
-                        if (nameElement && titleElement) {
-                            const name = nameElement.textContent.trim();
-                            const title = titleElement.textContent.trim();
-                            const category = getRoleCategory(title);
-                            // Try to find profile URL 
-                            const profileUrl = card.querySelector('a')?.href || '';
-                            
-                            if (name && title && name !== title) {
-                                results.push({
-                                    name,
-                                    title,
-                                    profileUrl,
-                                    category, 
-                                    source: 'people_you_may_know'
-                                });
-                            }
-                        }
-                    } catch (e) {
-                        // Ignore individual card errors
-                    }
-                });
-                
-                // Remove obvious duplicates
-                const uniqueResults = results.filter((person, index, self) => 
-                    index === self.findIndex(p => p.name === person.name && p.title === person.title)
-                );
-                
-                return uniqueResults;
-            }
-        """)
+        # Pull the rendered HTML once and parse it in Python rather than walking the DOM over CDP
+        return filter_people(parse_people_html(page.content()))
+    except Exception as e:
+        print(f"❌ Error extracting people data: {str(e)}")
+        return []
+
+def has_all_key_roles(people):
+    """Check whether the people found so far cover every key contact category"""
+    return KEY_CONTACT_ROLES.keys() <= {person.get('category') for person in people}
+
+def filter_people(people_data):
+    """Drop company listings and entries that don't look like a person's name"""
+    filtered_people = []
+    
+    for person in people_data:
+        name = person.get('name', '')
         
-        # Filter out company listings
-        filtered_people = []
-        known_company_names = ['headway', 'spring health', 'lyra health', 'sub-zero', 'anthropic', 
-                          'adobe', 'spotify', 'td securities', 'grow therapy']
+        # Skip if name is a known company
+        if _COMPANY_RE.search(name):
+            print(f"Skipping company: {name}")
+            continue
         
-        for person in people_data:
-            name = person.get('name', '')
-            
-            # Skip if name is a known company
-            is_company = any(company in name.lower() for company in known_company_names)
-            if is_company:
-                print(f"Skipping company: {name}")
+        # Make sure it's a person name (contains space, not just a company name)
+        if ' ' in name and person.get('name') != person.get('title'):
+            filtered_people.append(person)
+            print(f"Found: {person.get('name')} - {person.get('title')} [{person.get('category')}]")
+        
+    return filtered_people
+
+def parse_people_html(html):
+    """Extract people from LinkedIn page HTML using the PEOPLE_HTML_METHODS selectors"""
+    tree = HTMLParser(html)
+    people = []
+    
+    for source, container, name_selector, title_selector in PEOPLE_HTML_METHODS:
+        for card in tree.css(container):
+            name_node = card.css_first(name_selector)
+            title_node = card.css_first(title_selector)
+            if name_node is None or title_node is None:
                 continue
             
-            # Make sure it's a person name (contains space, not just a company name)
-            if ' ' in name and person.get('name') != person.get('title'):
-                filtered_people.append(person)
-                print(f"Found: {person.get('name')} - {person.get('title')} [{person.get('category')}]")
+            name = name_node.text().strip()
+            title = title_node.text().strip()
             
-        return filtered_people
-    except Exception as e:
-        print(f"❌ Error extracting people data: {str(e)}")
-        return []
+            # Only add if it seems like a valid person (not a company)
+            if not name or not title or name == title:
+                continue
+            
+            link = name_node if name_node.tag == "a" else name_node.css_first("a") or card.css_first("a")
+            people.append({
+                "name": name,
+                "title": title,
+                "profileUrl": (link.attributes.get("href") or "") if link is not None else "",
+                "category": get_role_category(title),
+                "source": source
+            })
+    
+    return people
+
+def get_priority(person):
+    """Sort key: category priority, nudged up for the most relevant titles"""
+    base_priority = CATEGORY_PRIORITY.get(person.get('category', 'other'), 10)
+    title = person.get('title', '')
+    
+    for pattern, boost in _TITLE_BOOSTS:
+        if pattern.search(title):
+            return base_priority - boost
+    
+    return base_priority
 
 def prioritize_by_role(people):
     """Sort people by role category and title importance"""
-    category_priority = {
-        "leadership": 1,
-        "data_ai": 2,
-        "recruiting": 3,
-        "other": 4
-    }
+    return sorted(people, key=get_priority)
+
+def launch_browser(playwright):
+    """Launch the persistent Chromium context used for login and the scraping fallback"""
+    return playwright.chromium.launch_persistent_context(
+        user_data_dir="./linkedin-data",
+        headless=HEADLESS,
+        viewport={"width": 1280, "height": 800},
+        args=BROWSER_ARGS
+    )
+
+@contextmanager
+def browser_session(browser_context=None):
+    """Yield the given browser context, or launch a temporary one for the duration of the block
+    
+    Temporary browsers hold _PROFILE_LOCK, so threads take turns with the shared profile.
+    """
+    if browser_context is not None:
+        yield browser_context
+        return
     
-    # First by category, then by presence of key terms in title
-    def get_priority(person):
-        category = person.get('category', 'other')
-        title = person.get('title', '').lower()
+    with _PROFILE_LOCK, sync_playwright() as p:
+        browser_context = launch_browser(p)
+        try:
+            yield browser_context
+        finally:
+            browser_context.close()
+
+def ensure_logged_in(page):
+    """Open the feed and log in if the session is not already authenticated"""
+    print("🔑 Checking login status...")
+    page.goto("https://www.linkedin.com/feed/", timeout=20000)
+    
+    if not page.url.startswith("https://www.linkedin.com/feed"):
+        # Not logged in, so login
+        return login_linkedin(page)
+    
+    print("✅ Already logged in")
+    return True
+
+def get_linkedin_cookies(browser_context=None):
+    """Log in with Playwright once and return the authenticated session cookies"""
+    with browser_session(browser_context) as browser_context:
+        # Create new page
+        page = browser_context.new_page()
+        page.set_default_timeout(30000)  # 30 second timeout
         
-        # Basic category priority
-        base_priority = category_priority.get(category, 10)
+        try:
+            if not ensure_logged_in(page):
+                return None
+            
+            return browser_context.cookies("https://www.linkedin.com")
+        except Exception as e:
+            print(f"❌ Cookie acquisition error: {str(e)}")
+            return None
+        finally:
+            page.close()
+
+def authenticate_client(cookies):
+    """Load the browser's LinkedIn session cookies into the shared HTTP session"""
+    csrf_token = None
+    for cookie in cookies:
+        _SESSION_COOKIES.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+        if cookie["name"] == "JSESSIONID":
+            # Voyager expects the JSESSIONID value (without quotes) echoed as the CSRF token
+            csrf_token = cookie["value"].strip('"')
+    
+    # Set last: is_client_authenticated() checks for it, so other threads never see half a session
+    if csrf_token is not None:
+        _SESSION_HEADERS["csrf-token"] = csrf_token
+
+def is_client_authenticated():
+    """Check whether the shared HTTP session already carries a LinkedIn login"""
+    return "csrf-token" in _SESSION_HEADERS
+
+def ensure_client_authenticated(browser_context=None):
+    """Log the shared HTTP session in if needed; returns False if the login failed
+    
+    Concurrent callers wait for the first login instead of each launching a browser.
+    """
+    if is_client_authenticated():
+        return True
+    with _LOGIN_LOCK:
+        if is_client_authenticated():
+            return True
+        cookies = get_linkedin_cookies(browser_context)
+        if cookies is None:
+            return False
+        authenticate_client(cookies)
+        return True
+
+def get_company_universal_name(company_url):
+    """Extract the company slug (universal name) from a LinkedIn company URL"""
+    path = company_url.split("/company/", 1)[-1]
+    return path.strip("/").split("/")[0]
+
+def parse_voyager_people(data, source):
+    """Convert a Voyager JSON payload into the same dicts extract_people_data returns"""
+    people = []
+    for entry in data.get("included", []):
+        name = (entry.get("title") or {}).get("text", "").strip()
+        title = (entry.get("primarySubtitle") or {}).get("text", "").strip()
         
-        # Specialized leadership roles
-        if 'ceo' in title:
-            return base_priority - 0.5
-        if 'founder' in title:
-            return base_priority - 0.4
-        if 'head of data' in title or 'chief data' in title:
-            return base_priority - 0.3
-        if 'lead' in title:
-            return base_priority - 0.2
+        # Only entity results carry both a person name and a headline
+        if not name or not title or name == title:
+            continue
         
-        return base_priority
+        people.append({
+            "name": name,
+            "title": title,
+            "profileUrl": entry.get("navigationUrl", "").split("?")[0],
+            "category": get_role_category(title),
+            "source": source
+        })
     
-    return sorted(people, key=get_priority)
+    return people
 
-def find_key_contacts(company_url):
-    """Find top 3 key contacts: CEO/Founder, Head of Data/AI, and Recruiter"""
-    with sync_playwright() as p:
-        # Launch browser with persistent context for cookies
-        browser_context = p.chromium.launch_persistent_context(
-            user_data_dir="./linkedin-data",
-            headless=False,  # Set to True in production
-            viewport={"width": 1280, "height": 800}
-        )
+async def fetch_people_voyager(company_url, client):
+    """Fetch key people through LinkedIn's Voyager JSON API.
+    
+    Returns None when LinkedIn refuses the request (401/403) so the caller
+    can fall back to the browser.
+    """
+    universal_name = get_company_universal_name(company_url)
+    print(f"⚡ Looking up company via Voyager API: {universal_name}")
+    
+    response = await client.get(
+        f"{VOYAGER_API}/organization/companies",
+        params={"q": "universalName", "universalName": universal_name}
+    )
+    if response.status_code in (401, 403):
+        return None
+    response.raise_for_status()
+    
+    elements = response.json().get("data", {}).get("*elements", [])
+    if not elements:
+        print(f"⚠️ Company not found via Voyager API: {universal_name}")
+        return []
+    company_id = elements[0].split(":")[-1]
+    
+    # Search the company's employees for each key term, plus the unfiltered people list,
+    # all at once - the searches are independent and share one HTTP/2 connection
+    terms = SEARCH_TERMS + [""]
+    print(f"🔍 Voyager search for {', '.join(SEARCH_TERMS)} and all people at {universal_name}")
+    responses = await asyncio.gather(*[
+        client.get(voyager_people_search_url(company_id, term)) for term in terms
+    ])
+    
+    all_people = []
+    for response in responses:
+        if response.status_code in (401, 403):
+            return None
+        response.raise_for_status()
         
+        people = parse_voyager_people(response.json(), source="voyager")
+        for person in people:
+            print(f"Found: {person['name']} - {person['title']} [{person['category']}]")
+        all_people.extend(people)
+    
+    # Only fall through to the About page if the searches left a key role uncovered
+    if has_all_key_roles(all_people):
+        return all_people
+    
+    # The About page is plain HTML, so it is fetched and parsed without a browser. It is often
+    # behind the login wall over plain HTTP - then keep what the searches found
+    about_people = await fetch_about_people(company_url, client)
+    if about_people is not None:
+        all_people.extend(about_people)
+    
+    return all_people
+
+async def fetch_about_people(company_url, client):
+    """Fetch the company's About page over HTTP and parse people out of it.
+    
+    Returns None when LinkedIn answers with a login wall.
+    """
+    print(f"🌐 Fetching About page: {company_url}about/")
+    response = await client.get(f"{company_url}about/", headers={"accept": "text/html"}, follow_redirects=True)
+    if response.status_code in (401, 403, 999) or _LOGIN_WALL_RE.search(response.url.path):
+        return None
+    response.raise_for_status()
+    
+    return filter_people(parse_people_html(response.text))
+
+def voyager_people_search_url(company_id, keywords=""):
+    """Build the Voyager people-search URL for a company, optionally filtered by keywords"""
+    query = f"flagshipSearchIntent:SEARCH_SRP,queryParameters:(currentCompany:List({company_id}),resultType:List(PEOPLE))"
+    if keywords:
+        query = f"keywords:{quote(keywords)},{query}"
+    return (
+        f"{VOYAGER_API}/search/dash/clusters"
+        f"?decorationId=com.linkedin.voyager.dash.deco.search.SearchClusterCollection-175"
+        f"&origin=COMPANY_PAGE_CANNED_SEARCH&q=all&query=({query})&start=0"
+    )
+
+def find_people_with_browser(company_url, browser_context=None):
+    """Fallback: scrape people by rendering the LinkedIn pages in Chromium"""
+    with browser_session(browser_context) as browser_context:
         # Create new page
         page = browser_context.new_page()
         page.set_default_timeout(30000)  # 30 second timeout
+        block_heavy_resources(page)
         
         try:
-            # First check if already logged in
-            print("🔑 Checking login status...")
-            page.goto("https://www.linkedin.com/feed/", timeout=20000)
-            random_sleep()
-            
-            if not page.url.startswith("https://www.linkedin.com/feed"):
-                # Not logged in, so login
-                if not login_linkedin(page):
-                    browser_context.close()
-                    return {"error": "Login failed"}
-            else:
-                print("✅ Already logged in")
-            
-            # Process company URL
-            if not company_url.endswith('/'):
-                company_url += '/'
+            if not ensure_logged_in(page):
+                return {"error": "Login failed"}
             
             # Track all the people we find across different pages
             all_people = []
             
             # 1. Try searching for CEO/founder directly
-            search_terms = ["CEO", "founder", "head of data", "recruiter"]
-            for term in search_terms:
+            for term in SEARCH_TERMS:
                 try:
                     search_url = f"{company_url}people/?keywords={term}"
                     print(f"🔍 Searching for {term} at {search_url}")
-                    page.goto(search_url, timeout=30000)
-                    random_sleep(2, 3)
+                    page.goto(search_url, timeout=30000, wait_until="domcontentloaded")
+                    wait_for_people(page)
                     
                     # Extract people data
                     people = extract_people_data(page)
                     all_people.extend(people)
                 except Exception as e:
                     print(f"⚠️ Error searching for {term}: {str(e)}")
+                
+                # Stop navigating as soon as every key role has a candidate
+                if has_all_key_roles(all_people):
+                    print("✅ Found all key roles, skipping remaining pages")
+                    return all_people
             
             # 2. Also try the main people page
             try:
                 print(f"🌐 Navigating to main people page: {company_url}people/")
-                page.goto(f"{company_url}people/", timeout=30000)
-                random_sleep(2, 3)
+                page.goto(f"{company_url}people/", timeout=30000, wait_until="domcontentloaded")
+                wait_for_people(page)
                 
                 people = extract_people_data(page)
                 all_people.extend(people)
             except Exception as e:
                 print(f"⚠️ Error navigating to people page: {str(e)}")
             
+            if has_all_key_roles(all_people):
+                print("✅ Found all key roles, skipping About page")
+                return all_people
+            
             # 3. Also try About page
             try:
                 print(f"🌐 Checking About page: {company_url}about/")
-                page.goto(f"{company_url}about/", timeout=30000)
-                random_sleep(2, 3)
+                page.goto(f"{company_url}about/", timeout=30000, wait_until="domcontentloaded")
+                wait_for_people(page)
                 
                 people = extract_people_data(page)
                 all_people.extend(people)
             except Exception as e:
                 print(f"⚠️ Error navigating to About page: {str(e)}")
             
-            # Remove duplicates by name
-            unique_people = []
-            seen_names = set()
-            for person in all_people:
-                name = person.get('name')
-                if name and name not in seen_names:
-                    seen_names.add(name)
-                    unique_people.append(person)
-            
-            # Prioritize by role
-            prioritized_people = prioritize_by_role(unique_people)
-            
-            # Get top contacts per category
-            leadership_contact = next((p for p in prioritized_people if p.get('category') == 'leadership'), None)
-            data_ai_contact = next((p for p in prioritized_people if p.get('category') == 'data_ai'), None)
-            recruiting_contact = next((p for p in prioritized_people if p.get('category') == 'recruiting'), None)
-            
-            # Create result dictionary with top contacts
-            result = {
-                "company": company_url,
-                "key_contacts": []
-            }
-            
-            # Add contacts if found
-            if leadership_contact:
-                result["key_contacts"].append({
-                    "role": "CEO/Founder",
-                    "name": leadership_contact.get('name'),
-                    "title": leadership_contact.get('title'),
-                    "profile_url": leadership_contact.get('profileUrl', '')
-                })
-            
-            if data_ai_contact:
-                result["key_contacts"].append({
-                    "role": "Data/AI Leader",
-                    "name": data_ai_contact.get('name'),
-                    "title": data_ai_contact.get('title'),
-                    "profile_url": data_ai_contact.get('profileUrl', '')
-                })
-            
-            if recruiting_contact:
-                result["key_contacts"].append({
-                    "role": "Recruiter/HR",
-                    "name": recruiting_contact.get('name'),
-                    "title": recruiting_contact.get('title'),
-                    "profile_url": recruiting_contact.get('profileUrl', '')
-                })
-            
-            # If we didn't find specific roles, take top 3 contacts overall
-            if len(result["key_contacts"]) < 3 and len(prioritized_people) > 0:
-                for person in prioritized_people:
-                    # Skip if already added
-                    if any(contact["name"] == person.get('name') for contact in result["key_contacts"]):
-                        continue
-                    
-                    # Add this person
-                    result["key_contacts"].append({
-                        "role": "Other",
-                        "name": person.get('name'),
-                        "title": person.get('title'),
-                        "profile_url": person.get('profileUrl', '')
-                    })
-                    
-                    # Stop once we have 3 contacts
-                    if len(result["key_contacts"]) >= 3:
-                        break
-            
-            print("\n" + "="*50)
-            print(f"✅ FOUND {len(result['key_contacts'])} KEY CONTACTS:")
-            
-            for i, contact in enumerate(result["key_contacts"]):
-                print(f"\n{i+1}. {contact['role']}: {contact['name']}")
-                print(f"   TITLE: {contact['title']}")
-                if contact['profile_url']:
-                    print(f"   PROFILE: {contact['profile_url']}")
-            
-            print("="*50 + "\n")
-            
-            # Save results
-            with open("key_contacts.json", "w") as f:
-                json.dump(result, f, indent=2)
-            
-            # Also save as simple text file
-            with open("key_contacts.txt", "w") as f:
-                f.write(f"COMPANY: {company_url}\n\n")
-                for i, contact in enumerate(result["key_contacts"]):
-                    f.write(f"{i+1}. {contact['role']}: {contact['name']}\n")
-                    f.write(f"   TITLE: {contact['title']}\n")
-                    if contact['profile_url']:
-                        f.write(f"   PROFILE: {contact['profile_url']}\n")
-                    f.write("\n")
-            
-            print("💾 Results saved to key_contacts.json and key_contacts.txt")
-            
-            browser_context.close()
-            return result
+            return all_people
             
         except Exception as e:
             print(f"❌ Script error: {str(e)}")
             # Take a screenshot for debugging
-            try:
-                page.screenshot(path="error_screenshot.png")
-                print("📸 Saved error screenshot")
-            except:
-                pass
+            if DEBUG:
+                try:
+                    page.screenshot(path="error_screenshot.png")
+                    print("📸 Saved error screenshot")
+                except:
+                    pass
             
-            browser_context.close()
             return {"error": str(e)}
+        finally:
+            page.close()
+
+def select_key_contacts(company_url, all_people):
+    """Pick the top leadership, data/AI and recruiting contacts from the people found"""
+    # Remove duplicates by name and title in one pass, keeping the first occurrence
+    unique = {}
+    for person in all_people:
+        if person.get('name'):
+            unique.setdefault((person['name'], person.get('title')), person)
+    unique_people = list(unique.values())
+    
+    # Prioritize by role
+    prioritized_people = prioritize_by_role(unique_people)
+    
+    # Get top contacts per category in a single pass over the sorted list
+    picks = dict.fromkeys(KEY_CONTACT_ROLES)
+    for person in prioritized_people:
+        category = person.get('category')
+        if category in picks and picks[category] is None:
+            picks[category] = person
+            if all(picks.values()):
+                break
+    
+    # Create result dictionary with top contacts
+    result = {
+        "company": company_url,
+        "key_contacts": []
+    }
+    
+    # Add contacts if found
+    for category, contact in picks.items():
+        if contact:
+            result["key_contacts"].append({
+                "role": KEY_CONTACT_ROLES[category],
+                "name": contact.get('name'),
+                "title": contact.get('title'),
+                "profile_url": contact.get('profileUrl', '')
+            })
+    
+    # If we didn't find specific roles, take top 3 contacts overall
+    if len(result["key_contacts"]) < 3 and len(prioritized_people) > 0:
+        taken = {contact["name"] for contact in result["key_contacts"]}
+        for person in prioritized_people:
+            # Skip if already added
+            if person.get('name') in taken:
+                continue
+            taken.add(person.get('name'))
+            
+            # Add this person
+            result["key_contacts"].append({
+                "role": "Other",
+                "name": person.get('name'),
+                "title": person.get('title'),
+                "profile_url": person.get('profileUrl', '')
+            })
+            
+            # Stop once we have 3 contacts
+            if len(result["key_contacts"]) >= 3:
+                break
+    
+    return result
+
+def save_key_contacts(result):
+    """Print the key contacts and save them to key_contacts.json / key_contacts.txt"""
+    print("\n" + "="*50)
+    print(f"✅ FOUND {len(result['key_contacts'])} KEY CONTACTS:")
+    
+    for i, contact in enumerate(result["key_contacts"]):
+        print(f"\n{i+1}. {contact['role']}: {contact['name']}")
+        print(f"   TITLE: {contact['title']}")
+        if contact['profile_url']:
+            print(f"   PROFILE: {contact['profile_url']}")
+    
+    print("="*50 + "\n")
+    
+    # Save results
+    with open("key_contacts.json", "wb") as f:
+        f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+    
+    # Also save as simple text file
+    with open("key_contacts.txt", "w") as f:
+        f.write(f"COMPANY: {result['company']}\n\n")
+        for i, contact in enumerate(result["key_contacts"]):
+            f.write(f"{i+1}. {contact['role']}: {contact['name']}\n")
+            f.write(f"   TITLE: {contact['title']}\n")
+            if contact['profile_url']:
+                f.write(f"   PROFILE: {contact['profile_url']}\n")
+            f.write("\n")
+    
+    print("💾 Results saved to key_contacts.json and key_contacts.txt")
+
+def get_cache_path(company_url):
+    """Return the on-disk cache file for a company URL"""
+    digest = hashlib.blake2b(company_url.encode("utf-8"), digest_size=16).hexdigest()
+    return CACHE_DIR / f"{digest}.json"
+
+def load_cached_contacts(company_url):
+    """Return the cached key contacts for a company, or None if missing or expired"""
+    cache_path = get_cache_path(company_url)
+    if not cache_path.exists():
+        return None
+    
+    try:
+        cached = orjson.loads(cache_path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    
+    if time.time() - cached.get("cached_at", 0) > cached.get("ttl", CACHE_TTL):
+        return None
+    
+    return cached.get("result")
+
+def save_cached_contacts(company_url, result):
+    """Store key contacts for a company in the on-disk cache"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(get_cache_path(company_url), "wb") as f:
+        f.write(orjson.dumps({"cached_at": time.time(), "ttl": CACHE_TTL, "result": result}, option=orjson.OPT_INDENT_2))
+
+async def fetch_people_api(company_url, client=None):
+    """Run the Voyager people lookup, returning None if the API is unavailable"""
+    try:
+        if client is not None:
+            return await fetch_people_voyager(company_url, client)
+        async with new_http_client() as client:
+            return await fetch_people_voyager(company_url, client)
+    except Exception as e:
+        print(f"⚠️ Voyager API error: {str(e)}")
+        return None
+
+@lru_cache(maxsize=1)
+def _api_session():
+    """Shared HTTP client plus the event loop thread that drives it.
+    
+    Keeping one loop alive lets find_key_contacts() calls reuse the client's HTTP/2
+    connection instead of opening a new one per company. Created on first use, after
+    login, since the client copies the session cookies when it is built.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="linkedin-api", daemon=True).start()
+    return new_http_client(), loop
+
+def find_people_with_one_browser(company_urls):
+    """Run the browser fallback for several companies through a single Chromium context"""
+    with browser_session() as browser_context:
+        return [find_people_with_browser(company_url, browser_context) for company_url in company_urls]
+
+def finish_key_contacts(company_url, all_people):
+    """Select, save and cache the key contacts for a company"""
+    result = select_key_contacts(company_url, all_people)
+    save_key_contacts(result)
+    save_cached_contacts(company_url, result)
+    return result
+
+def find_key_contacts(company_url, refresh=False, browser_context=None):
+    """Find top 3 key contacts: CEO/Founder, Head of Data/AI, and Recruiter
+    
+    Pass an open browser_context to share one Chromium instance across many
+    companies; otherwise a browser is launched only when it is needed.
+    """
+    # Process company URL
+    if not company_url.endswith('/'):
+        company_url += '/'
+    
+    # Reuse a recent result for this company unless a refresh was requested
+    if not refresh:
+        cached_result = load_cached_contacts(company_url)
+        if cached_result is not None:
+            print(f"💾 Using cached key contacts for {company_url}")
+            return cached_result
+    
+    # Use the browser only to obtain session cookies (once), then query the Voyager API directly
+    if not ensure_client_authenticated(browser_context):
+        return {"error": "Login failed"}
+    
+    with _LOGIN_LOCK:  # so racing workers don't each build a session
+        client, loop = _api_session()
+    all_people = asyncio.run_coroutine_threadsafe(fetch_people_api(company_url, client), loop).result()
+    
+    # Fall back to rendering the pages when the API refuses or fails
+    if all_people is None:
+        print("🌐 Voyager API unavailable, falling back to browser scraping")
+        all_people = find_people_with_browser(company_url, browser_context)
+        if isinstance(all_people, dict):
+            return all_people
+    
+    return finish_key_contacts(company_url, all_people)
+
+async def find_key_contacts_many(company_urls, concurrency=8, refresh=False):
+    """Find key contacts for many companies at once.
+    
+    API lookups share one HTTP client and run up to `concurrency` companies at a
+    time; companies the API refuses are scraped afterwards with one shared browser.
+    Returns one result per URL, in input order.
+    """
+    company_urls = [url if url.endswith('/') else url + '/' for url in company_urls]
+    results = [None] * len(company_urls)
+    
+    # Serve what we can from the cache
+    pending = []
+    for i, company_url in enumerate(company_urls):
+        cached_result = None if refresh else load_cached_contacts(company_url)
+        if cached_result is not None:
+            print(f"💾 Using cached key contacts for {company_url}")
+            results[i] = cached_result
+        else:
+            pending.append(i)
+    
+    if not pending:
+        return results
+    
+    # Log in once for the whole batch
+    if not await asyncio.to_thread(ensure_client_authenticated):
+        for i in pending:
+            results[i] = {"error": "Login failed"}
+        return results
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async with new_http_client() as client:
+        async def fetch_one(i):
+            async with semaphore:
+                return i, await fetch_people_api(company_urls[i], client)
+        
+        fetched = await asyncio.gather(*[fetch_one(i) for i in pending])
+    
+    blocked = []
+    for i, all_people in fetched:
+        if all_people is None:
+            blocked.append(i)
+        else:
+            results[i] = finish_key_contacts(company_urls[i], all_people)
+    
+    # Sync Playwright is thread-bound, so all fallbacks run in one worker thread and one browser
+    if blocked:
+        print(f"🌐 Voyager API unavailable for {len(blocked)} companies, falling back to browser scraping")
+        scraped = await asyncio.to_thread(find_people_with_one_browser, [company_urls[i] for i in blocked])
+        for i, all_people in zip(blocked, scraped):
+            results[i] = all_people if isinstance(all_people, dict) else finish_key_contacts(company_urls[i], all_people)
+    
+    return results
 
 def parse_company_url(url):
     """Parse and normalize LinkedIn company URL"""
@@ -478,20 +839,22 @@ def parse_company_url(url):
     return url
 
 if __name__ == "__main__":
-    import sys
+    import argparse
     
-    # Get company URL from command line or use default
-    company_url = "https://www.linkedin.com/company/grow-therapy"
-    if len(sys.argv) > 1:
-        company_url = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Find key contacts at companies on LinkedIn")
+    parser.add_argument("company_urls", nargs="*", default=["https://www.linkedin.com/company/grow-therapy"],
+                        help="LinkedIn company URLs or handles")
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached results and search LinkedIn again")
+    parser.add_argument("--concurrency", type=int, default=8, help="Number of companies to look up at once")
+    args = parser.parse_args()
     
-    # Parse and normalize company URL
-    company_url = parse_company_url(company_url)
-    print(f"🔍 Looking for key contacts at: {company_url}")
+    company_urls = [parse_company_url(company_url) for company_url in args.company_urls]
+    print(f"🔍 Looking for key contacts at: {', '.join(company_urls)}")
     
-    # Find company key contacts
-    result = find_key_contacts(company_url)
+    # Find key contacts for every company, concurrently
+    results = asyncio.run(find_key_contacts_many(company_urls, concurrency=args.concurrency, refresh=args.refresh))
     
-    if not result or "error" in result:
-        error_msg = result.get('error', 'Unknown error') if result else "No results found"
-        print(f"❌ Failed to find key contacts: {error_msg}")
\ No newline at end of file
+    for company_url, result in zip(company_urls, results):
+        if not result or "error" in result:
+            error_msg = result.get('error', 'Unknown error') if result else "No results found"
+            print(f"❌ Failed to find key contacts at {company_url}: {error_msg}")
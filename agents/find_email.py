@@ -1,11 +1,20 @@
 # TODO: Predict or find email address using Hunter API
 import os
-import requests
-import json
+import asyncio
+import httpx
+from aiolimiter import AsyncLimiter
+import orjson
 import time
 import smtplib
 import dns.resolver
 import logging
+import re
+import threading
+import uuid
+from functools import lru_cache
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from dotenv import load_dotenv
 from email.utils import parseaddr
 
@@ -20,155 +29,304 @@ load_dotenv()
 HUNTER_API_KEY = os.getenv("HUNTER_API_KEY")
 APOLLO_API_KEY = os.getenv("APOLLO_API_KEY")
 
+# Provider requests per second - tune to your plan's quota
+HUNTER_RATE_LIMIT = float(os.getenv("HUNTER_RATE_LIMIT", "10"))
+APOLLO_RATE_LIMIT = float(os.getenv("APOLLO_RATE_LIMIT", "5"))
+
+# Set FIND_EMAIL_DEBUG=1 to cross-check the email regex against parseaddr
+DEBUG = os.getenv("FIND_EMAIL_DEBUG") == "1"
+
+_EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}$")
+
+# Hunter confidence score at which its answer is trusted without SMTP-probing permutations
+HIGH_CONFIDENCE_SCORE = 80
+
+# RCPT replies meaning the server won't take more recipients on this connection
+SMTP_THROTTLE_CODES = {421, 451, 452}
+SMTP_VERIFY_WORKERS = 8
+
+# Placeholders used in provider email patterns, e.g. "{first}.{l}"
+_NAME_VARS_RE = re.compile(r"\{(first|last|f|l|fi|li|f1|l1)\}")
+
+# Bulk CSV results are written out in chunks of this many rows
+CSV_WRITE_BATCH = 100
+
+# MX lookups are cached process-wide for the record's TTL, clamped to this range (seconds)
+MX_CACHE_MIN_TTL = 300
+MX_CACHE_MAX_TTL = 3600
+_MX_CACHE = {}  # domain -> (expiry, [mx hosts by preference])
+
+# Domains whose mail server accepts any recipient, so RCPT can't tell real mailboxes apart
+_CATCHALL_CACHE = {}  # domain -> bool
+
+# Provider API calls are retried on these statuses with exponential backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+
+# Hunter domain-search results are shared by every contact at the same company
+HUNTER_DOMAIN_CACHE_TTL = 30 * 60
+_HUNTER_DOMAIN_CACHE = {}  # domain -> (expiry, domain-search data)
+
+@dataclass(slots=True)
+class ProviderResult:
+    """Outcome of one email source (Hunter.io, Apollo.io, ...)"""
+    status: str = "unknown"
+    emails: list[str] = field(default_factory=list)
+    confidence: int = 0
+    message: str | None = None
+    note: str | None = None
+
+
+@dataclass(slots=True)
+class PermutationResult(ProviderResult):
+    """Outcome of the permutation check; `emails` holds the permutations that verified"""
+    permutations: list[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class EmailSearchResult:
+    """Everything EmailFinder.find_email learned about one person"""
+    full_name: str = ""
+    domain: str = ""
+    first_name: str = ""
+    last_name: str = ""
+    sources: dict[str, ProviderResult] = field(default_factory=dict)
+    valid_emails: list[str] = field(default_factory=list)
+    most_likely_email: str = ""
+    note: str | None = None
+    error: str | None = None
+
+
+def normalize_domain(domain):
+    """Reduce a domain or URL like 'https://user@www.Acme.com:443/path?x=1' to 'acme.com'"""
+    domain = domain.strip()
+    parts = urlsplit(domain if "://" in domain else f"//{domain}", allow_fragments=False)
+    netloc = parts.netloc.lower().rsplit("@", 1)[-1].split(":", 1)[0]
+    return netloc.removeprefix("www.")
+
+
+@lru_cache(maxsize=1024)
+def _name_variants(first_name, last_name):
+    """Lowercased name parts and initials, keyed by their email-pattern placeholder"""
+    first = first_name.lower().strip()
+    last = last_name.lower().strip()
+    first_initial = first[:1]
+    last_initial = last[:1]
+    return {
+        "first": first, "last": last, "f": first, "l": last,
+        "fi": first_initial, "li": last_initial, "f1": first_initial, "l1": last_initial
+    }
+
+
 class EmailFinder:
     def __init__(self):
         self.hunter_api_key = HUNTER_API_KEY
         self.apollo_api_key = APOLLO_API_KEY
+        self._client = None
+        # Per-provider rate limits, so a slow provider never stalls the others
+        self._hunter_limiter = AsyncLimiter(HUNTER_RATE_LIMIT, 1)
+        self._apollo_limiter = AsyncLimiter(APOLLO_RATE_LIMIT, 1)
+        self._hunter_pending = {}  # domain -> in-flight domain-search task
+    
+    async def __aenter__(self):
+        self._get_client()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _get_client(self):
+        """Return the shared HTTP/2 client, creating it on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+                headers={"User-Agent": "outreach-ai-email-finder/1.0"}
+            )
+        return self._client
+    
+    async def _request_json(self, method, url, limiter, **kwargs):
+        """Make a rate-limited API request, retrying transient failures; returns (status, json)"""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with limiter:
+                    response = await self._get_client().request(method, url, **kwargs)
+                if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+                    retry_after = response.headers.get("Retry-After", "")
+                    delay = float(retry_after) if retry_after.isdigit() else RETRY_BACKOFF * 2 ** attempt
+                else:
+                    return response.status_code, orjson.loads(response.content)
+            except httpx.TransportError:
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = RETRY_BACKOFF * 2 ** attempt
+            await asyncio.sleep(delay)
+    
+    async def close(self):
+        """Close the shared HTTP client"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
         
-    def find_email(self, full_name, domain):
+    async def find_email(self, full_name, domain):
         """Main method to find a CEO's email using multiple methods"""
         logger.info(f"Starting email search for {full_name} at {domain}")
         
         if not full_name or not domain:
-            return {"error": "Full name and domain are required"}
+            return EmailSearchResult(error="Full name and domain are required")
         
         # Clean inputs
         full_name = full_name.strip()
-        domain = domain.strip().lower()
-        if domain.startswith("http"):
-            domain = domain.split("//")[1]
-        if domain.startswith("www."):
-            domain = domain.replace("www.", "")
-        if "/" in domain:
-            domain = domain.split("/")[0]
+        domain = normalize_domain(domain)
             
         # Split the name
         name_parts = full_name.split()
         if len(name_parts) < 2:
-            return {"error": "Full name must include first and last name"}
+            return EmailSearchResult(error="Full name must include first and last name")
             
         first_name = name_parts[0]
         last_name = name_parts[-1]
         
-        results = {
-            "full_name": full_name,
-            "domain": domain,
-            "first_name": first_name, 
-            "last_name": last_name,
-            "sources": {},
-            "valid_emails": []
-        }
+        results = EmailSearchResult(
+            full_name=full_name,
+            domain=domain,
+            first_name=first_name,
+            last_name=last_name
+        )
         
-        # Method 1: Try Hunter.io API
-        hunter_result = self.try_hunter_io(first_name, last_name, domain)
-        results["sources"]["hunter"] = hunter_result
+        # Method 1: Hunter.io API and Method 2: Apollo.io API, queried at the same time
+        hunter_result, apollo_result = await asyncio.gather(
+            self.try_hunter_io(first_name, last_name, domain),
+            self.try_apollo_io(first_name, last_name, domain)
+        )
+        results.sources["hunter"] = hunter_result
+        results.sources["apollo"] = apollo_result
         
-        # Method 2: Try Apollo.io API
-        apollo_result = self.try_apollo_io(first_name, last_name, domain)
-        results["sources"]["apollo"] = apollo_result
+        # Method 3: Generate email permutations and verify them over DNS/SMTP (blocking, so
+        # in a thread) - the slowest step, so skip it when a provider already has a confident answer
+        hunter_confident = bool(hunter_result.emails) and hunter_result.confidence >= HIGH_CONFIDENCE_SCORE
+        if hunter_confident or (apollo_result.emails and apollo_result.note is None):
+            permutation_results = PermutationResult(status="skipped")
+        else:
+            permutation_results = await asyncio.to_thread(
+                self.generate_and_verify_emails, first_name, last_name, domain
+            )
+        results.sources["permutations"] = permutation_results
         
-        # Method 3: Generate email permutations and verify them
-        permutation_results = self.generate_and_verify_emails(first_name, last_name, domain)
-        results["sources"]["permutations"] = permutation_results
+        # Combine and rank results, remembering which emails are already verified: a
+        # confident Hunter match, an address Apollo has on file (not one it generated from
+        # the company pattern) or a permutation that passed the SMTP check
+        sources = [
+            (hunter_result.emails, hunter_confident),
+            (apollo_result.emails, apollo_result.note is None),
+            (permutation_results.emails, True)
+        ]
+        verified_by_email = {}
+        for emails, verified in sources:
+            for email in emails:
+                verified_by_email[email] = verified_by_email.get(email, False) or verified
         
-        # Combine and rank results
-        all_emails = []
+        # Dict keys are already unique and in discovery order
+        unique_emails = list(verified_by_email)
         
-        # Add Hunter.io emails if found
-        if hunter_result.get("emails"):
-            all_emails.extend(hunter_result["emails"])
-            
-        # Add Apollo emails if found
-        if apollo_result.get("emails"):
-            all_emails.extend(apollo_result["emails"])
-            
-        # Add valid permutation emails
-        if permutation_results.get("valid_emails"):
-            all_emails.extend(permutation_results["valid_emails"])
-            
-        # Remove duplicates while preserving order
-        unique_emails = []
-        for email in all_emails:
-            if email not in unique_emails:
-                unique_emails.append(email)
-        
-        results["valid_emails"] = unique_emails
+        results.valid_emails = unique_emails
         
         # Determine the most likely email
         if unique_emails:
-            # Prioritize verified emails
-            verified_emails = [e for e in unique_emails if self.is_deliverable(e)]
-            if verified_emails:
-                results["most_likely_email"] = verified_emails[0]
-            else:
-                results["most_likely_email"] = unique_emails[0]
+            # Prioritize verified emails, only probing over SMTP if none are verified yet
+            most_likely = next((e for e, verified in verified_by_email.items() if verified), None)
+            if most_likely is None:
+                most_likely = await asyncio.to_thread(
+                    lambda: next((e for e in unique_emails if self.is_deliverable(e)), None)
+                )
+            results.most_likely_email = most_likely or unique_emails[0]
         else:
             # If no emails found, generate a best guess
-            results["most_likely_email"] = f"{first_name.lower()}.{last_name.lower()}@{domain}"
-            results["note"] = "No verified emails found. This is a best guess based on common patterns."
+            names = _name_variants(first_name, last_name)
+            results.most_likely_email = f"{names['first']}.{names['last']}@{domain}"
+            results.note = "No verified emails found. This is a best guess based on common patterns."
             
         return results
             
-    def try_hunter_io(self, first_name, last_name, domain):
+    async def try_hunter_io(self, first_name, last_name, domain):
         """Use Hunter.io API to find email"""
-        result = {
-            "status": "unknown",
-            "emails": []
-        }
+        result = ProviderResult()
         
         if not self.hunter_api_key:
-            result["status"] = "skipped"
-            result["message"] = "Hunter.io API key not configured"
+            result.status = "skipped"
+            result.message = "Hunter.io API key not configured"
             return result
             
         try:
             # Try domain search first to find pattern
-            domain_search_url = f"https://api.hunter.io/v2/domain-search?domain={domain}&api_key={self.hunter_api_key}"
-            domain_response = requests.get(domain_search_url)
-            domain_data = domain_response.json()
+            domain_data = await self._hunter_domain(domain)
             
-            if domain_response.status_code == 200 and domain_data.get("data"):
-                # Extract email pattern if available
-                pattern = domain_data["data"].get("pattern")
-                
+            if domain_data:
                 # Look for the specific person in the results
-                if domain_data["data"].get("emails"):
-                    for email_data in domain_data["data"]["emails"]:
-                        if email_data.get("first_name", "").lower() == first_name.lower() and \
-                           email_data.get("last_name", "").lower() == last_name.lower():
-                            result["emails"].append(email_data["value"])
+                for email_data in domain_data.get("emails") or []:
+                    if (email_data.get("first_name") or "").lower() == first_name.lower() and \
+                       (email_data.get("last_name") or "").lower() == last_name.lower():
+                        result.emails.append(email_data["value"])
+                        result.confidence = result.confidence or email_data.get("confidence") or 0
                 
                 # If not found in results, try email finder endpoint
-                if not result["emails"]:
-                    finder_url = f"https://api.hunter.io/v2/email-finder?domain={domain}&first_name={first_name}&last_name={last_name}&api_key={self.hunter_api_key}"
-                    finder_response = requests.get(finder_url)
-                    finder_data = finder_response.json()
-                    
-                    if finder_response.status_code == 200 and finder_data.get("data"):
-                        email = finder_data["data"].get("email")
-                        if email:
-                            result["emails"].append(email)
-                            result["confidence"] = finder_data["data"].get("score", 0)
+                if not result.emails:
+                    finder_data = await self._hunter_finder(first_name, last_name, domain)
+                    if finder_data and finder_data.get("email"):
+                        result.emails.append(finder_data["email"])
+                        result.confidence = finder_data.get("score") or 0
             
-            result["status"] = "success" if result["emails"] else "no_results"
+            result.emails = list(dict.fromkeys(result.emails))
+            result.status = "success" if result.emails else "no_results"
             return result
                 
         except Exception as e:
             logger.error(f"Hunter.io API error: {str(e)}")
-            result["status"] = "error"
-            result["message"] = str(e)
+            result.status = "error"
+            result.message = str(e)
             return result
     
-    def try_apollo_io(self, first_name, last_name, domain):
+    async def _hunter_domain(self, domain):
+        """Fetch Hunter's domain-search data (pattern + known emails), cached per domain"""
+        cached = _HUNTER_DOMAIN_CACHE.get(domain)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+        
+        # Contacts at the same company looked up concurrently share one request
+        task = self._hunter_pending.get(domain)
+        if task is None:
+            task = asyncio.ensure_future(self._request_json(
+                "GET", "https://api.hunter.io/v2/domain-search", self._hunter_limiter,
+                params={"domain": domain, "api_key": self.hunter_api_key}
+            ))
+            self._hunter_pending[domain] = task
+            task.add_done_callback(lambda _: self._hunter_pending.pop(domain, None))
+        status, data = await asyncio.shield(task)
+        
+        if status != 200:
+            return None
+        domain_data = data.get("data")
+        _HUNTER_DOMAIN_CACHE[domain] = (time.monotonic() + HUNTER_DOMAIN_CACHE_TTL, domain_data)
+        return domain_data
+    
+    async def _hunter_finder(self, first_name, last_name, domain):
+        """Ask Hunter's email-finder endpoint for one person's address"""
+        status, data = await self._request_json(
+            "GET", "https://api.hunter.io/v2/email-finder", self._hunter_limiter,
+            params={"domain": domain, "first_name": first_name, "last_name": last_name,
+                    "api_key": self.hunter_api_key}
+        )
+        return data.get("data") if status == 200 else None
+    
+    async def try_apollo_io(self, first_name, last_name, domain):
         """Use Apollo.io API to find email"""
-        result = {
-            "status": "unknown",
-            "emails": []
-        }
+        result = ProviderResult()
         
         if not self.apollo_api_key:
-            result["status"] = "skipped"
-            result["message"] = "Apollo.io API key not configured"
+            result.status = "skipped"
+            result.message = "Apollo.io API key not configured"
             return result
             
         try:
@@ -185,46 +343,47 @@ class EmailFinder:
                 "per_page": 5  # Limit to 5 results
             }
             
-            response = requests.post(url, json=payload)
-            data = response.json()
+            status, data = await self._request_json("POST", url, self._apollo_limiter, json=payload)
             
-            if response.status_code == 200 and data.get("people"):
+            if status == 200 and data.get("people"):
                 for person in data["people"]:
                     if person.get("email"):
-                        result["emails"].append(person["email"])
+                        result.emails.append(person["email"])
                     
                     # Also check for email pattern
-                    if not result["emails"] and person.get("organization") and person["organization"].get("email_pattern"):
+                    if not result.emails and person.get("organization") and person["organization"].get("email_pattern"):
                         pattern = person["organization"]["email_pattern"]
                         # Apply pattern to generate email
                         email = self._apply_pattern(pattern, first_name, last_name, domain)
                         if email:
-                            result["emails"].append(email)
-                            result["note"] = "Generated from company email pattern"
+                            result.emails.append(email)
+                            result.note = "Generated from company email pattern"
             
-            result["status"] = "success" if result["emails"] else "no_results"
+            result.emails = list(dict.fromkeys(result.emails))
+            result.status = "success" if result.emails else "no_results"
             return result
                 
         except Exception as e:
             logger.error(f"Apollo.io API error: {str(e)}")
-            result["status"] = "error"
-            result["message"] = str(e)
+            result.status = "error"
+            result.message = str(e)
             return result
     
     def generate_and_verify_emails(self, first_name, last_name, domain):
         """Generate common email permutations and verify them"""
-        result = {
-            "status": "unknown",
-            "permutations": [],
-            "valid_emails": []
-        }
+        result = PermutationResult()
         
         try:
+            # No mail server means no address can be verified - don't bother building any
+            mx_host = self._get_mx_host(domain)
+            if not mx_host:
+                result.status = "no_mx_records"
+                return result
+            
             # Clean and normalize names
-            first = first_name.lower().strip()
-            last = last_name.lower().strip()
-            first_initial = first[0] if first else ""
-            last_initial = last[0] if last else ""
+            names = _name_variants(first_name, last_name)
+            first, last = names["first"], names["last"]
+            first_initial, last_initial = names["fi"], names["li"]
             
             # Common email patterns
             patterns = [
@@ -241,38 +400,53 @@ class EmailFinder:
                 f"{first_initial}{last_initial}@{domain}" # jd@example.com
             ]
             
-            result["permutations"] = patterns
+            result.permutations = patterns
             
-            # Verify each pattern with a basic check first
-            mx_records_exist = self._check_mx_records(domain)
+            # Verify all candidates over a single SMTP connection
+            verified = self._smtp_verify_batch(domain, patterns, mx_host)
+            result.emails = [email for email in patterns if verified.get(email)]
             
-            if not mx_records_exist:
-                result["status"] = "no_mx_records"
+            if _CATCHALL_CACHE.get(domain):
+                # Every permutation would "verify" - leave ranking to Hunter/Apollo
+                result.status = "catch_all"
                 return result
-                
-            # Verify each email
-            for email in patterns:
-                if self.is_deliverable(email):
-                    result["valid_emails"].append(email)
                     
-            result["status"] = "success" if result["valid_emails"] else "no_valid_emails"
+            result.status = "success" if result.emails else "no_valid_emails"
             return result
                 
         except Exception as e:
             logger.error(f"Email permutation error: {str(e)}")
-            result["status"] = "error"
-            result["message"] = str(e)
+            result.status = "error"
+            result.message = str(e)
             return result
     
-    def _check_mx_records(self, domain):
-        """Check if domain has MX records (required for email)"""
+    def _get_mx(self, domain):
+        """Return the domain's MX hosts ordered by preference, cached for the record's TTL"""
+        cached = _MX_CACHE.get(domain)
+        if cached and time.monotonic() < cached[0]:
+            return cached[1]
+        
+        try:
+            answer = dns.resolver.resolve(domain, 'MX', lifetime=3)
+            hosts = [str(r.exchange).rstrip('.') for r in sorted(answer, key=lambda r: r.preference)]
+            ttl = answer.rrset.ttl
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            # The domain definitely has no mail servers - remember that too
+            hosts, ttl = [], MX_CACHE_MIN_TTL
+        
+        ttl = min(max(ttl, MX_CACHE_MIN_TTL), MX_CACHE_MAX_TTL)
+        _MX_CACHE[domain] = (time.monotonic() + ttl, hosts)
+        return hosts
+    
+    def _get_mx_host(self, domain):
+        """Return the domain's preferred mail server, or None if it has none (required for email)"""
         try:
-            mx_records = dns.resolver.resolve(domain, 'MX')
-            return len(mx_records) > 0
+            hosts = self._get_mx(domain)
         except Exception:
-            return False
+            return None
+        return hosts[0] if hosts else None
     
-    def is_deliverable(self, email):
+    def is_deliverable(self, email, mx_host=None):
         """Check if an email is potentially deliverable using SMTP verification"""
         # Basic validation
         if not self._is_valid_email_format(email):
@@ -284,12 +458,17 @@ class EmailFinder:
         # Skip SMTP check in testing
         if os.getenv("SKIP_SMTP_CHECK") == "true":
             return True
+        
+        # A catch-all server accepts every address, so probing proves nothing
+        if _CATCHALL_CACHE.get(domain):
+            return None
             
         # Check deliverability with SMTP
         try:
-            # Try to get MX records for the domain
-            mx_records = dns.resolver.resolve(domain, 'MX')
-            mx_host = str(mx_records[0].exchange)
+            # Use the domain's preferred mail server unless the caller already looked it up
+            mx_host = mx_host or self._get_mx_host(domain)
+            if not mx_host:
+                return None
             
             # Connect to the mail server
             smtp = smtplib.SMTP(timeout=10)
@@ -306,36 +485,91 @@ class EmailFinder:
             # But don't rule it out completely
             return None  # Uncertain
     
+    def _smtp_verify_batch(self, domain, emails, mx_host=None):
+        """Check many addresses at one domain with a single SMTP session.
+        
+        Returns {email: True/False/None} like is_deliverable, issuing one RCPT TO per
+        address instead of reconnecting for each.
+        """
+        results = {email: False for email in emails if not self._is_valid_email_format(email)}
+        candidates = [email for email in emails if email not in results]
+        
+        # Skip SMTP check in testing
+        if os.getenv("SKIP_SMTP_CHECK") == "true":
+            results.update((email, True) for email in candidates)
+            return results
+        
+        # A catch-all server says yes to everything, so its answers are meaningless
+        if _CATCHALL_CACHE.get(domain):
+            results.update((email, None) for email in candidates)
+            return results
+        
+        connected = False
+        try:
+            mx_host = mx_host or self._get_mx_host(domain)
+            if not mx_host:
+                raise ValueError(f"No MX records for {domain}")
+            
+            smtp = smtplib.SMTP(timeout=10)
+            smtp.connect(mx_host)
+            connected = True
+            try:
+                smtp.helo(domain)
+                smtp.mail('')
+                
+                # The first time we see a domain, check whether it accepts a made-up mailbox
+                if domain not in _CATCHALL_CACHE:
+                    code, _ = smtp.rcpt(f"probe-{uuid.uuid4().hex}@{domain}")
+                    if code not in SMTP_THROTTLE_CODES:
+                        _CATCHALL_CACHE[domain] = code == 250
+                
+                if _CATCHALL_CACHE.get(domain):
+                    results.update((email, None) for email in candidates)
+                else:
+                    for email in candidates:
+                        code, _ = smtp.rcpt(email)
+                        if code in SMTP_THROTTLE_CODES:
+                            break
+                        results[email] = code == 250
+            finally:
+                smtp.quit()
+        except Exception:
+            pass
+        
+        remaining = [email for email in candidates if email not in results]
+        if remaining and connected:
+            # The server cut the session short (e.g. it limits RCPTs per connection), so
+            # check the rest in parallel with a connection each
+            with ThreadPoolExecutor(max_workers=min(SMTP_VERIFY_WORKERS, len(remaining))) as pool:
+                results.update(zip(remaining, pool.map(lambda e: self.is_deliverable(e, mx_host), remaining)))
+        
+        # Anything we couldn't check stays uncertain
+        for email in remaining:
+            results.setdefault(email, None)
+        
+        return results
+    
     def _is_valid_email_format(self, email):
         """Check if email has valid format"""
-        if not email or '@' not in email:
-            return False
-            
-        # Use parseaddr to validate format
-        name, addr = parseaddr(email)
-        return addr == email and '.' in addr.split('@')[1]
+        valid = bool(email) and _EMAIL_RE.match(email) is not None
+        
+        if DEBUG and email:
+            # Report addresses where the regex and the RFC 822 parser disagree
+            _, addr = parseaddr(email)
+            parsed_valid = addr == email and '@' in addr and '.' in addr.split('@')[1]
+            if parsed_valid != valid:
+                logger.debug(f"Email format check mismatch for {email!r}: regex={valid}, parseaddr={parsed_valid}")
+        
+        return valid
     
     def _apply_pattern(self, pattern, first_name, last_name, domain):
         """Apply an email pattern to generate an email address"""
         if not pattern:
             return None
             
-        # Normalize names
-        first = first_name.lower()
-        last = last_name.lower()
-        f_initial = first[0] if first else ""
-        l_initial = last[0] if last else ""
-        
-        # Replace patterns with actual values
-        email = pattern.lower()
-        email = email.replace("{first}", first)
-        email = email.replace("{last}", last)
-        email = email.replace("{f}", first)
-        email = email.replace("{l}", last)
-        email = email.replace("{fi}", f_initial)
-        email = email.replace("{li}", l_initial)
-        email = email.replace("{f1}", f_initial)
-        email = email.replace("{l1}", l_initial)
+        # Replace placeholders with the actual name parts in a single pass
+        names = _name_variants(first_name, last_name)
+        email = _NAME_VARS_RE.sub(lambda m: names[m.group(1)], pattern.lower())
         
         # Add domain if missing
         if "@" not in email:
@@ -347,38 +581,61 @@ class EmailFinder:
         return email
 
 
-def find_email(full_name, company_domain):
-    """Main function to find email address for a person at a company"""
-    finder = EmailFinder()
-    result = finder.find_email(full_name, company_domain)
+async def find_email_async(full_name, company_domain, finder=None):
+    """Find the email address for a person at a company (async version of find_email).
+    
+    Pass an open EmailFinder to share its HTTP client across many lookups.
+    """
+    if finder is None:
+        async with EmailFinder() as finder:
+            result = await finder.find_email(full_name, company_domain)
+    else:
+        result = await finder.find_email(full_name, company_domain)
     
     # Format the output
-    if "error" in result:
+    if result.error:
         return {
             "success": False,
-            "error": result["error"]
+            "error": result.error
         }
     
     output = {
         "success": True,
         "person": {
-            "full_name": result["full_name"],
-            "first_name": result["first_name"],
-            "last_name": result["last_name"]
+            "full_name": result.full_name,
+            "first_name": result.first_name,
+            "last_name": result.last_name
         },
-        "company_domain": result["domain"],
-        "most_likely_email": result.get("most_likely_email", ""),
-        "confidence": "high" if result.get("sources", {}).get("hunter", {}).get("emails") or 
-                            result.get("sources", {}).get("apollo", {}).get("emails") else "medium",
-        "all_possible_emails": result.get("valid_emails", [])
+        "company_domain": result.domain,
+        "most_likely_email": result.most_likely_email,
+        "confidence": "high" if any(result.sources[name].emails for name in ("hunter", "apollo")) else "medium",
+        "all_possible_emails": result.valid_emails
     }
     
-    if "note" in result:
-        output["note"] = result["note"]
+    if result.note:
+        output["note"] = result.note
         
     return output
 
 
+@lru_cache(maxsize=1)
+def _default_finder():
+    """Shared EmailFinder plus the event loop thread that drives it.
+    
+    Keeping one loop alive lets the finder's HTTP/2 connections, rate limits and
+    in-flight lookups carry over between find_email() calls.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="email-finder", daemon=True).start()
+    return EmailFinder(), loop
+
+
+def find_email(full_name, company_domain):
+    """Main function to find email address for a person at a company"""
+    finder, loop = _default_finder()
+    return asyncio.run_coroutine_threadsafe(find_email_async(full_name, company_domain, finder), loop).result()
+
+
 if __name__ == "__main__":
     import sys
     
@@ -390,7 +647,7 @@ if __name__ == "__main__":
     company_domain = sys.argv[2]
     
     result = find_email(full_name, company_domain)
-    print(json.dumps(result, indent=2))
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
     
     # Print user-friendly output
     print(f"\n{'='*50}")
@@ -415,19 +672,53 @@ if __name__ == "__main__":
     print(f"\n{'='*50}")
 
 
-def process_bulk_csv(input_csv, output_csv):
-    """Process a CSV file containing names and domains to find emails"""
+async def process_bulk_csv_async(input_csv, output_csv, concurrency=16):
+    """Process a CSV file of names and domains, looking up up to `concurrency` contacts at once.
+    
+    Rows are streamed from the input and written in input order; only rows finished ahead
+    of a still-running lookup are held back, so memory stays flat however large the file is.
+    """
     import csv
     
+    async def lookup(finder, index, row, full_name, domain):
+        logger.info(f"Processing: {full_name} at {domain}")
+        return index, row, await find_email_async(full_name, domain, finder)
+    
     try:
-        with open(input_csv, 'r') as infile:
+        with open(input_csv, 'r', newline='') as infile, open(output_csv, 'w', newline='') as outfile:
             reader = csv.DictReader(infile)
-            fieldnames = reader.fieldnames + ['most_likely_email', 'confidence', 'all_possible_emails']
+            fieldnames = tuple(reader.fieldnames) + ('most_likely_email', 'confidence', 'all_possible_emails')
+            writer = csv.writer(outfile)
+            writer.writerow(fieldnames)
+            pending = []
+            finished = {}
+            next_index = 0
             
-            with open(output_csv, 'w', newline='') as outfile:
-                writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-                writer.writeheader()
+            def record(index, row, result):
+                """Fill in a finished row, then write out every row that is now next in input order"""
+                nonlocal next_index
+                if result["success"]:
+                    row['most_likely_email'] = result['most_likely_email']
+                    row['confidence'] = result['confidence']
+                    row['all_possible_emails'] = ','.join(result['all_possible_emails'])
+                else:
+                    row['most_likely_email'] = 'ERROR'
+                    row['confidence'] = 'low'
+                    row['all_possible_emails'] = result.get('error', 'Unknown error')
                 
+                finished[index] = [row.get(field) for field in fieldnames]
+                while next_index in finished:
+                    pending.append(finished.pop(next_index))
+                    next_index += 1
+                if len(pending) >= CSV_WRITE_BATCH:
+                    writer.writerows(pending)
+                    pending.clear()
+                    outfile.flush()
+            
+            # One finder for the whole file so every lookup shares its HTTP client and rate limits
+            async with EmailFinder() as finder:
+                in_flight = set()
+                index = 0
                 for row in reader:
                     full_name = row.get('full_name') or f"{row.get('first_name', '')} {row.get('last_name', '')}".strip()
                     domain = row.get('domain') or row.get('company_domain')
@@ -436,26 +727,19 @@ def process_bulk_csv(input_csv, output_csv):
                         logger.warning(f"Skipping row: Missing name or domain: {row}")
                         continue
                     
-                    logger.info(f"Processing: {full_name} at {domain}")
-                    
-                    # Find email
-                    result = find_email(full_name, domain)
-                    
-                    # Update row with results
-                    if result["success"]:
-                        row['most_likely_email'] = result['most_likely_email']
-                        row['confidence'] = result['confidence']
-                        row['all_possible_emails'] = ','.join(result['all_possible_emails'])
-                    else:
-                        row['most_likely_email'] = 'ERROR'
-                        row['confidence'] = 'low'
-                        row['all_possible_emails'] = result.get('error', 'Unknown error')
+                    # Only read the next row once a lookup slot frees up
+                    if len(in_flight) >= concurrency:
+                        done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            record(*task.result())
                     
-                    # Write to output file
-                    writer.writerow(row)
-                    
-                    # Avoid rate limits
-                    time.sleep(1)
+                    in_flight.add(asyncio.create_task(lookup(finder, index, row, full_name, domain)))
+                    index += 1
+                
+                for next_done in asyncio.as_completed(in_flight):
+                    record(*await next_done)
+            
+            writer.writerows(pending)
         
         logger.info(f"Bulk processing complete. Results saved to {output_csv}")
         return {"success": True, "output_file": output_csv}
@@ -465,6 +749,11 @@ def process_bulk_csv(input_csv, output_csv):
         return {"success": False, "error": str(e)}
 
 
+def process_bulk_csv(input_csv, output_csv, concurrency=16):
+    """Process a CSV file containing names and domains to find emails"""
+    return asyncio.run(process_bulk_csv_async(input_csv, output_csv, concurrency))
+
+
 # Command line interface
 if __name__ == "__main__":
     import argparse
@@ -481,12 +770,13 @@ if __name__ == "__main__":
     bulk_parser = subparsers.add_parser("bulk", help="Process a CSV file of contacts")
     bulk_parser.add_argument("input_csv", help="Input CSV file with full_name and domain columns")
     bulk_parser.add_argument("--output", help="Output CSV file path", default="emails_output.csv")
+    bulk_parser.add_argument("--concurrency", type=int, default=16, help="Number of contacts to look up at once")
     
     args = parser.parse_args()
     
     if args.command == "find":
         result = find_email(args.full_name, args.domain)
-        print(json.dumps(result, indent=2))
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
         
         # Print user-friendly output
         print(f"\n{'='*50}")
@@ -511,7 +801,7 @@ if __name__ == "__main__":
         print(f"\n{'='*50}")
         
     elif args.command == "bulk":
-        result = process_bulk_csv(args.input_csv, args.output)
+        result = process_bulk_csv(args.input_csv, args.output, args.concurrency)
         if result["success"]:
             print(f"✅ Successfully processed contacts. Results saved to {result['output_file']}")
         else:
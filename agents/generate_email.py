@@ -1,108 +1,755 @@
 # TODO: Use LLM (Ollama/Mistral or GPT) to generate personalized email
 import os
 import sys
-import json
-import subprocess
-import requests
+import asyncio
+import httpx
 from typing import Dict, List, Optional
 import random
 import time
+import threading
+import re
+import hashlib
+import logging
+import orjson
+from functools import lru_cache
+from pathlib import Path
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+EMAIL_MAX_TOKENS = 1000
+# Most completion tokens gpt-3.5-turbo returns for one request, which caps batched prompts
+MAX_COMPLETION_TOKENS = 4096
+# The single-email prompt asks the model to end with this line, so generation stops right there
+EMAIL_END_MARKER = "[END]"
+# How long an Ollama availability check is trusted before probing the server again
+OLLAMA_CHECK_TTL = 60
+# Last availability check per Ollama URL, as (time.monotonic(), available); shared by every
+# EmailGenerator, since the generate_email() wrapper builds a new one per email
+_OLLAMA_CHECKS: Dict[str, tuple] = {}
+_OLLAMA_CHECK_LOCK = threading.Lock()
+# Generic industries where a short company description is enough for the small local model
+SIMPLE_INDUSTRIES = frozenset({
+    "technology", "tech", "software", "saas", "internet", "e-commerce", "ecommerce",
+    "retail", "marketing", "advertising", "consulting", "media"
+})
+SIMPLE_DESCRIPTION_MAX_CHARS = 80
+
+
+@lru_cache(maxsize=1)
+def _cfg() -> Dict:
+    """Settings from the environment and .env, read once on first use rather than at import"""
+    load_dotenv(override=False)
+    return {
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY"),
+        "USE_LOCAL_LLM": os.getenv("USE_LOCAL_LLM", "true").lower() == "true",
+        "LOCAL_LLM_MODEL": os.getenv("LOCAL_LLM_MODEL", "mistral:latest"),
+        # Faster model for simple companies (see SIMPLE_INDUSTRIES); empty to always use LOCAL_LLM_MODEL
+        "SMALL_LLM_MODEL": os.getenv("LOCAL_LLM_SMALL_MODEL", "llama3.2:3b"),
+        # Your OpenAI account's rate limits - requests are paced to stay under them instead of hitting 429s
+        "OPENAI_REQUESTS_PER_MINUTE": int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500")),
+        "OPENAI_TOKENS_PER_MINUTE": int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000")),
+        "OLLAMA_URL": os.getenv("OLLAMA_URL", "http://localhost:11434"),
+        # How long Ollama keeps the model loaded after a request, so later emails start warm
+        "OLLAMA_KEEP_ALIVE": os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
+        # Seconds to wait for Ollama to answer the availability check; raise it for a remote server
+        "OLLAMA_CHECK_TIMEOUT": float(os.getenv("OLLAMA_CHECK_TIMEOUT", "0.5")),
+        # Optionally cache generated emails on disk by prompt, so re-running the same outreach skips the LLM.
+        # Off by default: emails are sampled at temperature 0.7, so a cached one replays a single random draw
+        "EMAIL_CACHE_DIR": Path(os.getenv("GENERATE_EMAIL_CACHE_DIR", "cache/emails")),
+        "EMAIL_CACHE_TTL": int(os.getenv("GENERATE_EMAIL_CACHE_TTL", str(24 * 3600))),  # 1 day
+        "USE_EMAIL_CACHE": os.getenv("GENERATE_EMAIL_CACHE", "false").lower() == "true",
+        # Optional semantic cache: reuse an email written for a near-identical company (needs sentence-transformers)
+        "USE_SEMANTIC_CACHE": os.getenv("GENERATE_EMAIL_SEMANTIC_CACHE", "false").lower() == "true",
+        "SEMANTIC_CACHE_MODEL": os.getenv("GENERATE_EMAIL_SEMANTIC_MODEL", "all-MiniLM-L6-v2"),
+        "SEMANTIC_CACHE_THRESHOLD": float(os.getenv("GENERATE_EMAIL_SEMANTIC_THRESHOLD", "0.92")),
+        # Optional template cache: reuse an email across recipients at companies with the same industry and description
+        "USE_TEMPLATE_CACHE": os.getenv("GENERATE_EMAIL_TEMPLATE_CACHE", "false").lower() == "true",
+    }
+
+
+class RateLimiter:
+    """Token buckets for requests-per-minute and tokens-per-minute limits.
+    
+    Both buckets refill continuously; a call waits until each holds enough capacity,
+    so requests are paced to the limit rather than retried after a 429.
+    """
+    
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.available_request_capacity = float(requests_per_minute)
+        self.available_token_capacity = float(tokens_per_minute)
+        self._last_update = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        self.available_request_capacity = min(
+            self.requests_per_minute, self.available_request_capacity + self.requests_per_minute * elapsed / 60
+        )
+        self.available_token_capacity = min(
+            self.tokens_per_minute, self.available_token_capacity + self.tokens_per_minute * elapsed / 60
+        )
+    
+    def _try_consume(self, tokens: int) -> float:
+        """Take capacity for one request of `tokens` tokens; returns 0, or how long to wait first"""
+        tokens = min(tokens, self.tokens_per_minute)
+        with self._lock:
+            self._refill()
+            if self.available_request_capacity >= 1 and self.available_token_capacity >= tokens:
+                self.available_request_capacity -= 1
+                self.available_token_capacity -= tokens
+                return 0.0
+            request_wait = (1 - self.available_request_capacity) * 60 / self.requests_per_minute
+            token_wait = (tokens - self.available_token_capacity) * 60 / self.tokens_per_minute
+            return max(request_wait, token_wait, 0.01)
+    
+    def acquire_sync(self, tokens: int):
+        """Block until a request of `tokens` tokens fits under both limits"""
+        while (delay := self._try_consume(tokens)):
+            time.sleep(delay)
+    
+    async def acquire(self, tokens: int):
+        """Wait (without blocking the event loop) until a request of `tokens` tokens fits"""
+        while (delay := self._try_consume(tokens)):
+            await asyncio.sleep(delay)
+    
+    def update_from_headers(self, headers):
+        """Shrink the buckets to what the server says is actually left"""
+        with self._lock:
+            try:
+                if "x-ratelimit-remaining-requests" in headers:
+                    self.available_request_capacity = min(
+                        self.available_request_capacity, float(headers["x-ratelimit-remaining-requests"])
+                    )
+                if "x-ratelimit-remaining-tokens" in headers:
+                    self.available_token_capacity = min(
+                        self.available_token_capacity, float(headers["x-ratelimit-remaining-tokens"])
+                    )
+            except ValueError:
+                pass
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """Process-wide HTTP client, so every email reuses the pooled (HTTP/2 where possible) connections"""
+    return httpx.Client(http2=True, timeout=60)
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide OpenAI rate limiter, shared by every EmailGenerator since the limits apply to the whole account"""
+    return RateLimiter(_cfg()["OPENAI_REQUESTS_PER_MINUTE"], _cfg()["OPENAI_TOKENS_PER_MINUTE"])
+
+
+def estimate_tokens(prompt: str, max_tokens: int = EMAIL_MAX_TOKENS) -> int:
+    """Rough token count for a request: ~4 characters per prompt token plus the completion budget"""
+    return len(prompt) // 4 + max_tokens
+
+
+def email_finished(text: str) -> bool:
+    """True once a streamed email has reached EMAIL_END_MARKER"""
+    return EMAIL_END_MARKER in text
+
+
+def trim_email(text: str) -> str:
+    """Cut a streamed email off at EMAIL_END_MARKER, dropping the marker"""
+    return text.split(EMAIL_END_MARKER, 1)[0].strip()
+
+
+def parse_sse_line(line: str) -> Optional[str]:
+    """Return the text delta in one line of an OpenAI streaming response, if it has one"""
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if not data or data == "[DONE]":
+        return None
+    try:
+        event = orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return None
+    choices = event.get("choices") if isinstance(event, dict) else None
+    if not choices or not isinstance(choices[0], dict):
+        return None
+    content = (choices[0].get("delta") or {}).get("content")
+    return content if isinstance(content, str) else None
+
+
+def describe_error(status_code: int, body_start: bytes) -> str:
+    """Short description of a failed response: its status and the start of its body"""
+    return f"HTTP {status_code}: {body_start[:200].decode('utf-8', 'replace')}"
+
+
+class SemanticEmailCache:
+    """In-memory cache of emails keyed by an embedding of the company's industry and description.
+    
+    Emails are stored as templates with the company and recipient replaced by placeholders,
+    and filled in for the new recipient when a similar enough company comes along.
+    """
+    
+    def __init__(self, model_name: Optional[str] = None, threshold: Optional[float] = None):
+        self.model_name = model_name or _cfg()["SEMANTIC_CACHE_MODEL"]
+        self.threshold = threshold if threshold is not None else _cfg()["SEMANTIC_CACHE_THRESHOLD"]
+        self.enabled = True
+        self._encoder = None
+        self._embeddings = []  # unit vectors, so a dot product is the cosine similarity
+        self._entries = []     # (context, template) for each embedding
+    
+    def _embed(self, industry: str, company_description: str):
+        """Embed the canonical key for a company, loading the encoder on first use"""
+        if self._encoder is None:
+            from sentence_transformers import SentenceTransformer
+            self._encoder = SentenceTransformer(self.model_name)
+        key_text = f"{industry.lower().strip()}\n{' '.join(company_description.lower().split())}"
+        return self._encoder.encode(key_text, normalize_embeddings=True)
+    
+    def lookup(self, industry: str, company_description: str, context: tuple,
+               company_name: str, recipient_name: str) -> Optional[str]:
+        """Return a cached email adapted to this recipient, or None if nothing is similar enough.
+        
+        `context` (sender, skills, resume settings) must match exactly.
+        """
+        if not self.enabled or not self._entries:
+            return None
+        try:
+            import numpy as np
+            scores = np.stack(self._embeddings) @ self._embed(industry, company_description)
+        except ImportError:
+            logger.warning("Semantic cache disabled: sentence-transformers is not installed")
+            self.enabled = False
+            return None
+        
+        for index in np.argsort(scores)[::-1]:
+            if scores[index] < self.threshold:
+                break
+            entry_context, template = self._entries[index]
+            if entry_context == context:
+                return self._fill(template, company_name, recipient_name)
+        return None
+    
+    def add(self, industry: str, company_description: str, context: tuple,
+            company_name: str, recipient_name: str, email_text: str):
+        """Remember a generated email as a template for similar companies"""
+        template = self._templatize(email_text, company_name, recipient_name)
+        if not self.enabled or template is None:
+            return
+        try:
+            embedding = self._embed(industry, company_description)
+        except ImportError:
+            logger.warning("Semantic cache disabled: sentence-transformers is not installed")
+            self.enabled = False
+            return
+        self._embeddings.append(embedding)
+        self._entries.append((context, template))
+    
+    @staticmethod
+    def _templatize(email_text: str, company_name: str, recipient_name: str) -> Optional[str]:
+        """Replace the company and recipient names in an email with placeholders
+        
+        Returns None when either name is blank, since the email can't be made generic then.
+        The first name alone is only replaced in the greeting, where it can't be a common word ("Will", "Mark").
+        """
+        company_name, recipient_name = company_name.strip(), recipient_name.strip()
+        if not company_name or not recipient_name:
+            return None
+        template = re.sub(re.escape(company_name), "{{COMPANY}}", email_text, flags=re.I)
+        template = re.sub(re.escape(recipient_name), "{{RECIPIENT}}", template, flags=re.I)
+        first_name = recipient_name.split()[0]
+        return re.sub(rf"^([ \t]*(?:hi|hello|hey|dear)[ \t]+){re.escape(first_name)}\b", r"\1{{RECIPIENT_FIRST}}",
+                      template, count=1, flags=re.I | re.M)
+    
+    @staticmethod
+    def _fill(template: str, company_name: str, recipient_name: str) -> str:
+        """Fill a template's placeholders in for a new company and recipient"""
+        first_name = recipient_name.split()[0] if recipient_name.split() else recipient_name
+        return (template.replace("{{COMPANY}}", company_name)
+                        .replace("{{RECIPIENT}}", recipient_name)
+                        .replace("{{RECIPIENT_FIRST}}", first_name))
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> SemanticEmailCache:
+    """Process-wide semantic cache, shared by every EmailGenerator"""
+    return SemanticEmailCache()
+
+
+# Skills mentioned when the caller doesn't pass any
+DEFAULT_SKILLS = (
+    "Built 2 AI agents for automated data analysis and predictive modeling",
+    "Developed data science pipelines that improved business insights by 32%",
+    "Created advanced analytics dashboards for real-time decision making",
+    "Implemented machine learning solutions that optimized key business processes"
+)
+
+# Skills to highlight for each kind of contact (leadership, data_ai, recruiting)
+SKILLS_BY_ROLE = {
+    "data_ai": (
+        "Built custom AI models for predictive analytics and pattern recognition",
+        "Developed end-to-end data science workflows reducing analysis time by 40%",
+        "Created interactive visualization tools for complex data interpretation",
+        "Implemented advanced statistical methods that improved forecast accuracy by 28%"
+    ),
+    "recruiting": (
+        "Built data-driven talent analytics platforms",
+        "Developed AI-powered candidate assessment tools",
+        "Created predictive models for recruitment success metrics",
+        "Implemented analytics dashboards for optimizing hiring processes"
+    ),
+    "leadership": DEFAULT_SKILLS,
+    None: DEFAULT_SKILLS,
+}
+
+# Tone and layout rules shared by the single-email and batch prompts
+EMAIL_STYLE_GUIDE = """Make the email sound natural and human, as if written by a real person. It should be conversational and warm, but professional.
+Avoid buzzwords like "excited," "passionate," or "resonate." 
+Keep the email between 150-200 words.
+Make sure it includes bullet points for skills similar to the example.
+Don't use formal HR language - this should feel like a genuine personal email.
+
+The format should look like:
+Subject: [Short attention-grabbing subject line]
+
+Hi [Name],
+[Opening with specific knowledge about company]
+
+Here's what I've built:
+• [Skill point 1]
+• [Skill point 2]
+• [Skill point 3]
+
+[Brief connection to company mission]
+
+[Clear ask for interview]
+[Mention resume attachment if included]
+Best,
+[Candidate name]
+
+P.S. [Brief personal note]"""
+
+# Static part of the single-email prompt; the recipient's details are appended under "## Variables"
+SINGLE_EMAIL_INSTRUCTIONS = f"""Write a short, warm, personalized cold outreach email from a job applicant to the CEO/founder
+of a company. The applicant, recipient, company and skills are given under "## Variables" at the end.
+
+The email should include:
+1. A warm, personal greeting
+2. A specific comment showing knowledge of the company
+3. Brief mention of the listed skills/achievements
+4. A clear ask for an interview opportunity for a data science, AI, or analytics role
+5. A brief mention of the attached resume, only if the variables say one is attached
+6. A brief sign-off with the applicant's name
+7. A short P.S. that adds a personal touch
+
+{EMAIL_STYLE_GUIDE}
+
+End your reply with a line containing only {EMAIL_END_MARKER}, right after the P.S."""
+
+# Full single-email prompt; the instructions never change, so they go first and the
+# per-recipient details last, letting the LLM provider reuse its cache of the shared prefix
+PROMPT_TEMPLATE = SINGLE_EMAIL_INSTRUCTIONS + """
+
+## Variables
+Applicant: {candidate_name}
+Recipient: {recipient_name}, the CEO/founder of {company_name}
+Industry: {industry}
+Company description: {company_description}
+Skills/achievements to mention:
+{skills_text}
+Resume: {resume_line}
+"""
+RESUME_ATTACHED_LINE = "attached as '{resume_filename}' - include a brief mention of it"
+RESUME_NOT_ATTACHED_LINE = "not attached - don't mention a resume"
+
+
+def _specialize_prompt(skills: tuple, include_resume: bool) -> str:
+    """PROMPT_TEMPLATE with the skills and resume line filled in, leaving the per-recipient placeholders"""
+    skills_text = "\n".join(f"- {skill}" for skill in skills)
+    return PROMPT_TEMPLATE.format(
+        candidate_name="{candidate_name}",
+        recipient_name="{recipient_name}",
+        company_name="{company_name}",
+        industry="{industry}",
+        company_description="{company_description}",
+        skills_text=skills_text.replace("{", "{{").replace("}", "}}"),
+        resume_line=RESUME_ATTACHED_LINE if include_resume else RESUME_NOT_ATTACHED_LINE
+    )
+
+
+# Prompt templates for the built-in skill sets, keyed by (skills, include_resume), so rendering
+# an email for one of them is a single format() call
+PROMPT_CACHE = {
+    (skills, include_resume): _specialize_prompt(skills, include_resume)
+    for skills in set(SKILLS_BY_ROLE.values())
+    for include_resume in (False, True)
+}
+
+# Static part of the batch prompt; the recipients are appended under "## Recipients"
+BATCH_EMAIL_INSTRUCTIONS = f"""Write a separate short, warm, personalized cold outreach email for each recipient listed
+under "## Recipients" at the end.
+
+Each email should include a warm, personal greeting, a specific comment showing knowledge of the company,
+brief mention of the listed skills/achievements, a clear ask for an interview opportunity for a data science,
+AI, or analytics role, a brief sign-off with the applicant's name and a short P.S. that adds a personal touch.
+
+{EMAIL_STYLE_GUIDE}
+
+Start each email with a line containing only its marker - <<<EMAIL 1>>>, <<<EMAIL 2>>> and so on - and write
+nothing else between the emails."""
+
+# "Subject: ..." line of a generated email, and the body after it
+_SUBJECT_RE = re.compile(r"Subject:\s*(.+?)\n+(.*)", re.S)
+
+# Separates the emails in a batched LLM response
+_BATCH_MARKER_RE = re.compile(r"^\s*<<<EMAIL (\d+)>>>\s*$", re.M)
 
-# Configuration
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-USE_LOCAL_LLM = os.getenv("USE_LOCAL_LLM", "true").lower() == "true"
-LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "mistral:latest")
 
 class EmailGenerator:
     """Generate personalized cold outreach emails using local LLM or GPT fallback"""
     
-    def __init__(self):
-        """Initialize the email generator with configuration"""
-        self.use_local_llm = USE_LOCAL_LLM
-        self.local_model = LOCAL_LLM_MODEL
-        self.openai_api_key = OPENAI_API_KEY
+    def __init__(self, use_cache: Optional[bool] = None):
+        """Initialize the email generator with configuration
+        
+        Args:
+            use_cache: Reuse the email generated earlier for an identical prompt
+                (default: the GENERATE_EMAIL_CACHE setting)
+        """
+        cfg = _cfg()
+        self.use_cache = cfg["USE_EMAIL_CACHE"] if use_cache is None else use_cache
+        self.use_semantic_cache = cfg["USE_SEMANTIC_CACHE"]
+        self.use_template_cache = cfg["USE_TEMPLATE_CACHE"]
+        self.use_local_llm = cfg["USE_LOCAL_LLM"]
+        self.local_model = cfg["LOCAL_LLM_MODEL"]
+        self.small_model = cfg["SMALL_LLM_MODEL"]
+        self.openai_api_key = cfg["OPENAI_API_KEY"]
+        self.ollama_url = cfg["OLLAMA_URL"]
+        self.ollama_keep_alive = cfg["OLLAMA_KEEP_ALIVE"]
+        self.ollama_check_timeout = cfg["OLLAMA_CHECK_TIMEOUT"]
+        self.cache_dir = cfg["EMAIL_CACHE_DIR"]
+        self.cache_ttl = cfg["EMAIL_CACHE_TTL"]
+        self._http = None  # httpx.AsyncClient for the async OpenAI path, created on first use
         
     def check_ollama_available(self) -> bool:
-        """Check if Ollama is available and running"""
-        try:
-            # Try to run a simple Ollama command
-            result = subprocess.run(
-                ["ollama", "list"], 
-                capture_output=True, 
-                text=True, 
-                timeout=5
-            )
-            return result.returncode == 0
-        except (subprocess.SubprocessError, FileNotFoundError):
-            return False
+        """Check if the Ollama server is running (re-checked at most every OLLAMA_CHECK_TTL seconds)"""
+        with _OLLAMA_CHECK_LOCK:
+            now = time.monotonic()
+            last_check = _OLLAMA_CHECKS.get(self.ollama_url)
+            if last_check is not None and now - last_check[0] < OLLAMA_CHECK_TTL:
+                return last_check[1]
+            
+            try:
+                ok = get_http_client().get(f"{self.ollama_url}/api/tags", timeout=self.ollama_check_timeout).is_success
+            except httpx.HTTPError:
+                ok = False
+            _OLLAMA_CHECKS[self.ollama_url] = (now, ok)
+            return ok
     
-    def generate_with_ollama(self, prompt: str) -> str:
-        """Generate email using Ollama with local LLM"""
+    def generate_with_ollama(self, prompt: str, max_tokens: int = EMAIL_MAX_TOKENS,
+                             stop_early: bool = True, model: Optional[str] = None) -> str:
+        """Generate email using Ollama with local LLM
+        
+        The response is streamed so generation can stop as soon as the email is complete.
+        """
         try:
-            print(f"Using local LLM: {self.local_model}")
+            model = model or self.local_model
+            logger.debug("Using local LLM: %s", model)
+            options = {"num_predict": max_tokens}
+            if stop_early:
+                options["stop"] = [EMAIL_END_MARKER]
             
-            # Run the Ollama command
-            result = subprocess.run(
-                ["ollama", "run", self.local_model, prompt],
-                capture_output=True,
-                text=True,
+            # Ask the running Ollama server, which keeps the model loaded between emails
+            with get_http_client().stream(
+                "POST",
+                f"{self.ollama_url}/api/generate",
+                json={
+                    "model": model,
+                    "prompt": prompt,
+                    "stream": True,
+                    "keep_alive": self.ollama_keep_alive,
+                    "options": options
+                },
                 timeout=60  # 60 second timeout
-            )
-            
-            if result.returncode != 0:
-                print(f"Ollama error: {result.stderr}")
-                return None
+            ) as response:
+                if response.status_code != 200:
+                    logger.error("Ollama error: %s", describe_error(response.status_code, next(response.iter_bytes(), b'')))
+                    return None
                 
-            return result.stdout.strip()
+                text = ""
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = orjson.loads(line)
+                    if not isinstance(chunk, dict):
+                        continue
+                    text += chunk.get("response") or ""
+                    if chunk.get("done") or (stop_early and email_finished(text)):
+                        break
             
-        except subprocess.SubprocessError as e:
-            print(f"Ollama subprocess error: {str(e)}")
+            return trim_email(text) if stop_early else text.strip()
+            
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            logger.error("Ollama request error: %s", e)
             return None
     
-    def generate_with_api(self, prompt: str) -> str:
-        """Generate email using OpenAI API (fallback)"""
-        if not self.openai_api_key:
-            raise ValueError("OpenAI API key not configured")
-            
+    def get_cache_path(self, prompt: str) -> Path:
+        """Return the on-disk cache file for a prompt"""
+        digest = hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+    
+    def load_cached_email(self, prompt: str) -> Optional[str]:
+        """Return the email generated earlier for this exact prompt, or None if missing or expired"""
+        cache_path = self.get_cache_path(prompt)
+        if not cache_path.exists():
+            return None
+        
         try:
-            print("Using OpenAI API as fallback")
-            
-            headers = {
+            cached = orjson.loads(cache_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        
+        if time.time() - cached.get("cached_at", 0) > cached.get("ttl", self.cache_ttl):
+            return None
+        
+        return cached.get("email_text")
+    
+    def save_cached_email(self, prompt: str, email_text: str):
+        """Store a generated email in the on-disk cache"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.get_cache_path(prompt), "wb") as f:
+            f.write(orjson.dumps({"cached_at": time.time(), "ttl": self.cache_ttl, "email_text": email_text}))
+    
+    def _api_request(self, prompt: str, max_tokens: int = EMAIL_MAX_TOKENS, stop_early: bool = True) -> Dict:
+        """Build the streaming OpenAI chat completion request (headers and JSON payload) for a prompt"""
+        request = {
+            "headers": {
                 "Content-Type": "application/json",
                 "Authorization": f"Bearer {self.openai_api_key}"
-            }
-            
-            payload = {
+            },
+            "json": {
                 "model": "gpt-3.5-turbo",
                 "messages": [
                     {"role": "system", "content": "You are a helpful assistant that generates personalized, warm, and natural-sounding cold outreach emails that feel like they were written by a human job applicant. Avoid buzzwords like 'excited', 'passionate', or 'resonate'. Write in a conversational, warm tone with specific personal details."},
                     {"role": "user", "content": prompt}
                 ],
                 "temperature": 0.7,
-                "max_tokens": 1000
+                "max_tokens": max_tokens,
+                "stream": True
             }
+        }
+        if stop_early:
+            request["json"]["stop"] = [EMAIL_END_MARKER]
+        return request
+    
+    def generate_with_api(self, prompt: str, max_tokens: int = EMAIL_MAX_TOKENS,
+                          stop_early: bool = True) -> str:
+        """Generate email using OpenAI API (fallback)"""
+        if not self.openai_api_key:
+            raise ValueError("OpenAI API key not configured")
             
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=payload
-            )
+        try:
+            logger.debug("Using OpenAI API as fallback")
             
-            if response.status_code != 200:
-                print(f"OpenAI API error: {response.text}")
-                return None
+            get_rate_limiter().acquire_sync(estimate_tokens(prompt, max_tokens))
+            with get_http_client().stream("POST", OPENAI_CHAT_URL,
+                                          **self._api_request(prompt, max_tokens, stop_early)) as response:
+                get_rate_limiter().update_from_headers(response.headers)
+                
+                if response.status_code != 200:
+                    logger.error("OpenAI API error: %s", describe_error(response.status_code, next(response.iter_bytes(), b'')))
+                    return None
                 
-            result = response.json()
-            return result["choices"][0]["message"]["content"].strip()
+                # Stream the completion and hang up once the email is done
+                text = ""
+                for line in response.iter_lines():
+                    text += parse_sse_line(line) or ""
+                    if stop_early and email_finished(text):
+                        break
+            
+            return trim_email(text) if stop_early else text.strip()
             
         except Exception as e:
-            print(f"OpenAI API error: {str(e)}")
+            logger.error("OpenAI API error: %s", e)
             return None
     
+    async def generate_with_api_async(self, prompt: str, max_tokens: int = EMAIL_MAX_TOKENS,
+                                      stop_early: bool = True) -> Optional[str]:
+        """Generate email using the OpenAI API without blocking the event loop"""
+        if not self.openai_api_key:
+            raise ValueError("OpenAI API key not configured")
+        
+        if self._http is None:
+            self._http = httpx.AsyncClient(http2=True, timeout=60)
+        
+        try:
+            await get_rate_limiter().acquire(estimate_tokens(prompt, max_tokens))
+            async with self._http.stream("POST", OPENAI_CHAT_URL,
+                                         **self._api_request(prompt, max_tokens, stop_early)) as response:
+                get_rate_limiter().update_from_headers(response.headers)
+                
+                if response.status_code != 200:
+                    body_start = b""
+                    async for body_start in response.aiter_bytes():
+                        break
+                    logger.error("OpenAI API error: %s", describe_error(response.status_code, body_start))
+                    return None
+                
+                text = ""
+                async for line in response.aiter_lines():
+                    text += parse_sse_line(line) or ""
+                    if stop_early and email_finished(text):
+                        break
+            
+            return trim_email(text) if stop_early else text.strip()
+            
+        except Exception as e:
+            logger.error("OpenAI API error: %s", e)
+            return None
+    
+    def _pick_model(self, spec: Dict) -> str:
+        """Choose the local model for one email: the small one when the company is simple to write about"""
+        if (self.small_model
+                and len(spec["company_description"]) < SIMPLE_DESCRIPTION_MAX_CHARS
+                and spec["industry"].strip().lower() in SIMPLE_INDUSTRIES):
+            return self.small_model
+        return self.local_model
+    
+    def generate_text(self, prompt: str, max_tokens: int = EMAIL_MAX_TOKENS,
+                      stop_early: bool = True, model: Optional[str] = None) -> Optional[str]:
+        """Run a prompt through the local LLM, falling back to the OpenAI API
+        
+        Args:
+            prompt: The prompt to run
+            max_tokens: Completion token budget
+            stop_early: Stop generating at the end of the first email (off for multi-email prompts)
+            model: Local model to use (default: LOCAL_LLM_MODEL)
+        """
+        email_text = None
+        model = model or self.local_model
+        
+        # Try to generate with local LLM first
+        if self.use_local_llm and self.check_ollama_available():
+            email_text = self.generate_with_ollama(prompt, max_tokens, stop_early, model)
+            # The small model may not be pulled - retry with the main one
+            if not email_text and model != self.local_model:
+                email_text = self.generate_with_ollama(prompt, max_tokens, stop_early)
+        
+        # Fall back to API if local generation fails
+        if not email_text and self.openai_api_key:
+            email_text = self.generate_with_api(prompt, max_tokens, stop_early)
+        
+        return email_text
+    
+    async def generate_text_async(self, prompt: str, model: Optional[str] = None) -> Optional[str]:
+        """Async version of generate_text; Ollama requests run in a worker thread"""
+        email_text = None
+        model = model or self.local_model
+        
+        if self.use_local_llm and await asyncio.to_thread(self.check_ollama_available):
+            email_text = await asyncio.to_thread(self.generate_with_ollama, prompt, EMAIL_MAX_TOKENS, True, model)
+            if not email_text and model != self.local_model:
+                email_text = await asyncio.to_thread(self.generate_with_ollama, prompt)
+        
+        if not email_text and self.openai_api_key:
+            email_text = await self.generate_with_api_async(prompt)
+        
+        return email_text
+    
+    def _prepare(self, recipient_name: str, company_name: str, industry: str,
+                 company_description: str = "", candidate_name: str = "Spoorthi",
+                 candidate_skills: List[str] = None, include_resume: bool = False,
+                 resume_filename: str = "resume.pdf"):
+        """Fill in defaults for one recipient and render its prompt; returns (spec, prompt)"""
+        spec = {
+            "recipient_name": recipient_name,
+            "company_name": company_name,
+            "industry": industry,
+            "company_description": company_description,
+            "candidate_name": candidate_name,
+            "candidate_skills": candidate_skills or DEFAULT_SKILLS,
+            "include_resume": include_resume,
+            "resume_filename": resume_filename
+        }
+        return spec, self.build_prompt(**spec)
+    
+    def _from_cache(self, spec: Dict, prompt: str) -> Optional[str]:
+        """Return an email generated earlier for this prompt or a near-identical company, from whichever caches are enabled"""
+        # Reuse the email from an identical earlier request if we have one
+        email_text = self.load_cached_email(prompt) if self.use_cache else None
+        
+        # Or one written for the same industry and description, with the names swapped in
+        if not email_text and self.use_template_cache:
+            template = self.load_cached_email(self._template_key(spec))
+            if template:
+                email_text = SemanticEmailCache._fill(template, spec["company_name"], spec["recipient_name"])
+        
+        # Or one written for a near-identical company, with the names swapped in
+        if not email_text and self.use_semantic_cache:
+            email_text = get_semantic_cache().lookup(
+                spec["industry"], spec["company_description"], self._semantic_context(spec),
+                spec["company_name"], spec["recipient_name"]
+            )
+        return email_text
+    
+    def _remember(self, spec: Dict, prompt: str, email_text: str):
+        """Store a freshly generated email in the enabled caches"""
+        if self.use_cache:
+            self.save_cached_email(prompt, email_text)
+        if self.use_template_cache:
+            template = SemanticEmailCache._templatize(email_text, spec["company_name"], spec["recipient_name"])
+            if template is not None:
+                self.save_cached_email(self._template_key(spec), template)
+        if self.use_semantic_cache:
+            get_semantic_cache().add(
+                spec["industry"], spec["company_description"], self._semantic_context(spec),
+                spec["company_name"], spec["recipient_name"], email_text
+            )
+    
+    def _template_key(self, spec: Dict) -> str:
+        """Cache key shared by every recipient at companies with the same industry, description and sender settings"""
+        description = " ".join(spec["company_description"].lower().split())[:500]
+        return "template\n" + orjson.dumps(
+            [spec["industry"].lower().strip(), description, *self._semantic_context(spec)]
+        ).decode()
+    
+    @staticmethod
+    def _semantic_context(spec: Dict) -> tuple:
+        """Fields that must match exactly for a semantic cache hit"""
+        return (spec["candidate_name"], tuple(spec["candidate_skills"]),
+                spec["include_resume"], spec["resume_filename"])
+    
+    def build_prompt(self, recipient_name: str, company_name: str, industry: str,
+                     company_description: str, candidate_name: str, candidate_skills: List[str],
+                     include_resume: bool, resume_filename: str) -> str:
+        """Render the LLM prompt for one recipient"""
+        template = PROMPT_CACHE.get((tuple(candidate_skills), include_resume))
+        if template is not None:
+            return template.format(
+                candidate_name=candidate_name,
+                recipient_name=recipient_name,
+                company_name=company_name,
+                industry=industry,
+                company_description=company_description,
+                resume_filename=resume_filename
+            )
+        
+        # Custom skills - render the full template
+        if include_resume:
+            resume_line = RESUME_ATTACHED_LINE.format(resume_filename=resume_filename)
+        else:
+            resume_line = RESUME_NOT_ATTACHED_LINE
+        
+        return PROMPT_TEMPLATE.format(
+            candidate_name=candidate_name,
+            recipient_name=recipient_name,
+            company_name=company_name,
+            industry=industry,
+            company_description=company_description,
+            skills_text="\n".join(f"- {skill}" for skill in candidate_skills),
+            resume_line=resume_line
+        )
+    
     def generate_email(self, 
                       recipient_name: str,
                       company_name: str, 
@@ -128,76 +775,59 @@ class EmailGenerator:
         Returns:
             Dict containing the generated email and metadata
         """
-        if not candidate_skills:
-            candidate_skills = [
-                "Built 2 AI agents for automated data analysis and predictive modeling",
-                "Developed data science pipelines that improved business insights by 32%",
-                "Created advanced analytics dashboards for real-time decision making",
-                "Implemented machine learning solutions that optimized key business processes"
-            ]
-        
-        # Format skills as bullet points for prompt
-        skills_text = "\n".join([f"- {skill}" for skill in candidate_skills])
-        
-        # Add resume attachment instruction
-        resume_instruction = ""
-        if include_resume:
-            resume_instruction = f"Include a brief mention that you've attached your resume ('{resume_filename}') for more details."
+        spec, prompt = self._prepare(recipient_name, company_name, industry, company_description,
+                                     candidate_name, candidate_skills, include_resume, resume_filename)
         
-        # Create prompt
-        prompt = f"""
-Write a short, warm, personalized cold outreach email from a job applicant named {candidate_name} to {recipient_name}, 
-the CEO/founder of {company_name}, which is in the {industry} industry.
-
-Company description: {company_description}
-
-The email should include:
-1. A warm, personal greeting
-2. A specific comment showing knowledge of the company
-3. Brief mention of these relevant skills/achievements:
-{skills_text}
-4. A clear ask for an interview opportunity for a data science, AI, or analytics role
-5. {resume_instruction}
-6. A brief sign-off with the applicant's name
-7. A short P.S. that adds a personal touch
-
-Make the email sound natural and human, as if written by a real person. It should be conversational and warm, but professional.
-Avoid buzzwords like "excited," "passionate," or "resonate." 
-Keep the email between 150-200 words.
-Make sure it includes bullet points for skills similar to the example.
-Don't use formal HR language - this should feel like a genuine personal email.
-
-The format should look like:
-Subject: [Short attention-grabbing subject line]
-
-Hi [Name],
-[Opening with specific knowledge about company]
-
-Here's what I've built:
-• [Skill point 1]
-• [Skill point 2]
-• [Skill point 3]
-
-[Brief connection to company mission]
-
-[Clear ask for interview]
-[Mention resume attachment if included]
-Best,
-[Candidate name]
-
-P.S. [Brief personal note]
-"""
+        email_text = self._from_cache(spec, prompt)
+        if not email_text:
+            email_text = self.generate_text(prompt, model=self._pick_model(spec))
+            if email_text:
+                self._remember(spec, prompt, email_text)
         
-        # Try to generate with local LLM first
-        email_text = None
+        return self._build_result(email_text, recipient_name, company_name, industry, include_resume)
+    
+    async def generate_email_async(self, **kwargs) -> Dict:
+        """Async version of generate_email, taking the same keyword arguments"""
+        spec, prompt = self._prepare(**kwargs)
         
-        if self.use_local_llm and self.check_ollama_available():
-            email_text = self.generate_with_ollama(prompt)
+        email_text = self._from_cache(spec, prompt)
+        if not email_text:
+            email_text = await self.generate_text_async(prompt, self._pick_model(spec))
+            if email_text:
+                self._remember(spec, prompt, email_text)
         
-        # Fall back to API if local generation fails
-        if not email_text and self.openai_api_key:
-            email_text = self.generate_with_api(prompt)
+        return self._build_result(email_text, spec["recipient_name"], spec["company_name"],
+                                  spec["industry"], spec["include_resume"])
+    
+    async def generate_emails_concurrent(self, rows: List[Dict], max_concurrent: int = 10) -> List[Dict]:
+        """
+        Generate emails for many recipients at once, at most `max_concurrent` in flight
+        
+        Args:
+            rows: Dicts of generate_email keyword arguments, one per recipient
+            max_concurrent: Maximum number of simultaneous LLM requests
+            
+        Returns:
+            List of generate_email result dicts, in the same order as `rows`
+        """
+        sem = asyncio.Semaphore(max_concurrent)
+        unique, slots = self._dedupe_rows(rows)
         
+        async def worker(row):
+            async with sem:
+                return await self.generate_email_async(**row)
+        
+        try:
+            results = await asyncio.gather(*(worker(row) for row in unique))
+            return [results[i] for i in slots]
+        finally:
+            if self._http is not None:
+                await self._http.aclose()
+                self._http = None
+    
+    def _build_result(self, email_text: Optional[str], recipient_name: str, company_name: str,
+                      industry: str, include_resume: bool) -> Dict:
+        """Split generated text into subject and body and wrap it in the result dict"""
         if not email_text:
             return {
                 "success": False,
@@ -205,17 +835,8 @@ P.S. [Brief personal note]
             }
         
         # Extract subject line if present
-        subject = ""
-        body = email_text
-        
-        if "Subject:" in email_text:
-            parts = email_text.split("Subject:", 1)
-            if len(parts) > 1:
-                subject_and_body = parts[1].strip()
-                if "\n" in subject_and_body:
-                    subject, body = subject_and_body.split("\n", 1)
-                    subject = subject.strip()
-                    body = body.strip()
+        match = _SUBJECT_RE.search(email_text)
+        subject, body = (match.group(1).strip(), match.group(2).strip()) if match else ("", email_text)
         
         return {
             "success": True,
@@ -230,6 +851,104 @@ P.S. [Brief personal note]
             }
         }
 
+    def generate_emails_batch(self, recipients: List[Dict], batch_size: int = 8) -> List[Dict]:
+        """
+        Generate emails for several recipients with one LLM request per `batch_size` of them
+        
+        The shared instructions are sent once per batch instead of once per email.
+        
+        Args:
+            recipients: Dicts of generate_email keyword arguments, one per recipient
+            batch_size: Maximum number of emails to ask for in a single request
+            
+        Returns:
+            List of generate_email result dicts, in the same order as `recipients`
+        """
+        unique, slots = self._dedupe_rows(recipients)
+        prepared = [self._prepare(**recipient) for recipient in unique]
+        specs = [spec for spec, _ in prepared]
+        prompts = [prompt for _, prompt in prepared]
+        results = [None] * len(specs)
+        
+        # Anything generated before comes straight from the cache
+        email_texts = [self._from_cache(spec, prompt) for spec, prompt in prepared]
+        pending = [i for i, text in enumerate(email_texts) if not text]
+        
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            batch_text = self.generate_text(self._build_batch_prompt([specs[i] for i in chunk]),
+                                            max_tokens=min(EMAIL_MAX_TOKENS * len(chunk), MAX_COMPLETION_TOKENS),
+                                            stop_early=False)
+            for number, text in self._split_batch_response(batch_text).items():
+                if 1 <= number <= len(chunk) and text:
+                    index = chunk[number - 1]
+                    email_texts[index] = text
+                    self._remember(specs[index], prompts[index], text)
+        
+        for i, spec in enumerate(specs):
+            if email_texts[i]:
+                results[i] = self._build_result(email_texts[i], spec["recipient_name"], spec["company_name"],
+                                                spec["industry"], spec["include_resume"])
+            else:
+                # The model skipped or mangled this one - generate it on its own
+                results[i] = self.generate_email(**spec)
+        
+        return [results[i] for i in slots]
+    
+    @staticmethod
+    def _dedupe_rows(rows: List[Dict]):
+        """Collapse repeated rows for the same recipient at the same company
+        
+        Names are compared case- and whitespace-insensitively; every other argument must match exactly.
+        
+        Returns:
+            (unique rows, index into the unique rows for each input row)
+        """
+        unique, positions, slots = [], {}, []
+        for row in rows:
+            key = (
+                str(row.get("company_name", "")).lower().strip(),
+                str(row.get("recipient_name", "")).lower().strip(),
+                tuple(sorted((name, tuple(value) if isinstance(value, list) else value)
+                             for name, value in row.items() if name not in ("company_name", "recipient_name")))
+            )
+            if key not in positions:
+                positions[key] = len(unique)
+                unique.append(row)
+            slots.append(positions[key])
+        return unique, slots
+    
+    def _build_batch_prompt(self, specs: List[Dict]) -> str:
+        """Render one prompt asking for an email to each recipient in `specs`"""
+        sections = []
+        for number, spec in enumerate(specs, 1):
+            skills_text = "\n".join(f"  - {skill}" for skill in spec["candidate_skills"])
+            resume_note = "Resume: " + (RESUME_ATTACHED_LINE.format(resume_filename=spec["resume_filename"])
+                                        if spec["include_resume"] else RESUME_NOT_ATTACHED_LINE)
+            sections.append(f"""Recipient {number}:
+- From: {spec['candidate_name']} (job applicant)
+- To: {spec['recipient_name']}, the CEO/founder of {spec['company_name']}, which is in the {spec['industry']} industry
+- Company description: {spec['company_description']}
+- Skills/achievements to mention:
+{skills_text}
+- {resume_note}""")
+        
+        recipients_text = "\n\n".join(sections)
+        return f"""{BATCH_EMAIL_INSTRUCTIONS}
+
+## Recipients
+{recipients_text}
+"""
+    
+    def _split_batch_response(self, batch_text: Optional[str]) -> Dict[int, str]:
+        """Split a batched LLM response into {recipient number: email text}"""
+        if not batch_text:
+            return {}
+        parts = _BATCH_MARKER_RE.split(batch_text)
+        # parts = [preamble, number, text, number, text, ...]
+        return {int(number): text.strip() for number, text in zip(parts[1::2], parts[2::2])}
+
+
 # Wrapper function for EmailGenerator.generate_email to make it easier to import
 def generate_email(recipient_name, company_name, industry, company_description="", contact_role=None, candidate_name="Spoorthi"):
     """
@@ -250,21 +969,7 @@ def generate_email(recipient_name, company_name, industry, company_description="
     generator = EmailGenerator()
     
     # Determine skills based on contact role
-    skills = None
-    if contact_role == "data_ai":
-        skills = [
-            "Built custom AI models for predictive analytics and pattern recognition",
-            "Developed end-to-end data science workflows reducing analysis time by 40%",
-            "Created interactive visualization tools for complex data interpretation",
-            "Implemented advanced statistical methods that improved forecast accuracy by 28%"
-        ]
-    elif contact_role == "recruiting":
-        skills = [
-            "Built data-driven talent analytics platforms",
-            "Developed AI-powered candidate assessment tools",
-            "Created predictive models for recruitment success metrics",
-            "Implemented analytics dashboards for optimizing hiring processes"
-        ]
+    skills = SKILLS_BY_ROLE.get(contact_role, DEFAULT_SKILLS)
     
     # Generate email using class method
     result = generator.generate_email(
@@ -284,20 +989,52 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Generate personalized outreach emails")
-    parser.add_argument("--name", required=True, help="Recipient's name (CEO/founder)")
-    parser.add_argument("--company", required=True, help="Company name")
-    parser.add_argument("--industry", required=True, help="Company industry")
+    parser.add_argument("--name", help="Recipient's name (CEO/founder)")
+    parser.add_argument("--company", help="Company name")
+    parser.add_argument("--industry", help="Company industry")
     parser.add_argument("--description", help="Company description", default="")
     parser.add_argument("--sender", help="Sender's name", default="Spoorthi")
     parser.add_argument("--skills", nargs="+", help="List of sender's skills/achievements")
     parser.add_argument("--resume", help="Resume filename to mention in email", default="resume.pdf")
     parser.add_argument("--include-resume", action="store_true", help="Include resume attachment mention")
     parser.add_argument("--output", help="Output file (if not specified, prints to console)")
+    parser.add_argument("--no-cache", action="store_true", help="Always generate a fresh email instead of reusing a cached one")
+    parser.add_argument("--recipients", help="JSON file with a list of recipients (generate_email keyword arguments) to write emails for concurrently")
+    parser.add_argument("--concurrency", type=int, default=10, help="Maximum simultaneous LLM requests with --recipients")
     
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
     # Initialize generator
-    generator = EmailGenerator()
+    generator = EmailGenerator(use_cache=False if args.no_cache else None)
+    if args.no_cache:
+        generator.use_template_cache = generator.use_semantic_cache = False
+    
+    if args.recipients:
+        with open(args.recipients, "rb") as f:
+            rows = orjson.loads(f.read())
+        results = asyncio.run(generator.generate_emails_concurrent(rows, args.concurrency))
+        
+        if args.output:
+            with open(args.output, "wb") as f:
+                f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+            print(f"{len(results)} emails saved to {args.output}")
+        else:
+            for row, result in zip(rows, results):
+                print("\n" + "="*50)
+                print(f"To: {row.get('recipient_name')} ({row.get('company_name')})")
+                if result["success"]:
+                    print(f"Subject: {result['subject']}")
+                    print("="*50 + "\n")
+                    print(result['body'])
+                else:
+                    print(f"Error: {result['error']}")
+            print("\n" + "="*50)
+        return
+    
+    if not (args.name and args.company and args.industry):
+        parser.error("--name, --company and --industry are required unless --recipients is given")
     
     # Generate email
     result = generator.generate_email(
@@ -1,11 +1,95 @@
-import pandas as pd
+import os
+import hashlib
+import openpyxl
+import orjson
+
+try:
+   from python_calamine import CalamineWorkbook
+   _HAS_CALAMINE = True
+except ImportError:
+   _HAS_CALAMINE = False
+
+
+# Spreadsheet column -> key in the returned records
+COLUMNS = {
+   'Company': 'Company Name',
+   'Website': 'Website',
+   'Company Linkedin Url': 'LinkedIn URL',
+}
+HEADER_ROW = 4  # the first 3 rows of the export are a title block
+
+# Parsed spreadsheets, one file per input path, kept out of the data folder
+CACHE_DIR = "cache/read_excel"
+
+
+def _cache_path(filepath):
+   """Cache file for a spreadsheet, named by a hash of its absolute path"""
+   digest = hashlib.blake2b(os.path.abspath(filepath).encode('utf-8'), digest_size=16).hexdigest()
+   return os.path.join(CACHE_DIR, f"{digest}.json")
+
+
+def iter_company_data(filepath):
+   """Yield one record per company row, without loading the whole sheet first"""
+   # Reuse the parsed rows from the last run if the spreadsheet hasn't changed since
+   cache_path = _cache_path(filepath)
+   stat = os.stat(filepath)
+   try:
+      with open(cache_path, 'rb') as f:
+         cached = orjson.loads(f.read())
+      if cached.get('mtime_ns') == stat.st_mtime_ns and cached.get('size') == stat.st_size:
+         yield from cached['records']
+         return
+   except (OSError, orjson.JSONDecodeError, KeyError):
+      pass
+
+   # Records are handed out as they are parsed; the cache is only written once the sheet is fully read
+   records = []
+   for record in _iter_company_sheet(filepath):
+      records.append(record)
+      yield record
+
+   try:
+      os.makedirs(CACHE_DIR, exist_ok=True)
+      with open(cache_path, 'wb') as f:
+         f.write(orjson.dumps({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'records': records}))
+   except OSError:
+      pass  # read-only location - just parse again next time
 
 
 def read_company_data(filepath):
-   df = pd.read_excel(filepath, skiprows=3)
-   df = df[['Company', 'Website', 'Company Linkedin Url']].dropna(subset=['Company'])
-   df.columns = ['Company Name', 'Website', 'LinkedIn URL']
-   return df.to_dict(orient='records')
+   return list(iter_company_data(filepath))
+
+
+def _iter_company_sheet(filepath):
+   if _HAS_CALAMINE:
+      yield from _iter_company_rows(_iter_calamine_rows(filepath))
+      return
+
+   # Stream the sheet read-only and pick out just the columns we need
+   wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+   try:
+      yield from _iter_company_rows(wb.active.iter_rows(min_row=HEADER_ROW, values_only=True))
+   finally:
+      wb.close()
+
+
+def _iter_calamine_rows(filepath):
+   # python-calamine parses the sheet in Rust; empty cells come back as '' rather than None
+   sheet = CalamineWorkbook.from_path(filepath).get_sheet_by_index(0)
+   for row in sheet.to_python(skip_empty_area=False)[HEADER_ROW - 1:]:
+      yield tuple(None if value == '' else value for value in row)
+
+
+def _iter_company_rows(rows):
+   # The first row is the header; pick out just the columns we need from the rest
+   header = next(rows, ())
+   indexes = {key: header.index(column) for column, key in COLUMNS.items()}
+   company_index = indexes['Company Name']
+
+   for row in rows:
+      if company_index >= len(row) or row[company_index] is None:
+         continue
+      yield {key: row[i] if i < len(row) else None for key, i in indexes.items()}
 
 
 # Example usage
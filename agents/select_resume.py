@@ -2,15 +2,34 @@ import os
 import sys
 import json
 from pathlib import Path
-import subprocess
 import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
+import time
+import hashlib
+import math
+from collections import Counter
+from functools import lru_cache
+import orjson
 from typing import Dict, List, Optional, Tuple
 import logging
 import re
 import requests
-from bs4 import BeautifulSoup
+from selectolax.parser import HTMLParser
 from dotenv import load_dotenv
 
+# Optional resume text extractors - without them resumes are judged by filename
+try:
+    import PyPDF2
+    _HAS_PYPDF2 = True
+except ImportError:
+    _HAS_PYPDF2 = False
+try:
+    import docx
+    _HAS_DOCX = True
+except ImportError:
+    _HAS_DOCX = False
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -25,6 +44,167 @@ RESUME_DIR = os.getenv("RESUME_DIR", os.path.join(os.path.dirname(os.path.dirnam
 USE_LOCAL_LLM = os.getenv("USE_LOCAL_LLM", "true").lower() == "true"
 LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "mistral:latest")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+# How long Ollama keeps the model loaded after a request, so later selections start warm
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+# Only the start of a company website is analyzed, so stop downloading after this many bytes
+MAX_WEBSITE_BYTES = 1_000_000
+MAX_WEBSITE_TEXT = 8000
+
+# Website analyses and LLM answers are cached on disk, so re-running outreach for the same company is instant
+RESUME_CACHE_DIR = Path(os.getenv("RESUME_CACHE_DIR", "cache/resume_selector"))
+RESUME_CACHE_TTL = int(os.getenv("RESUME_CACHE_TTL", str(24 * 3600)))  # 1 day
+USE_RESUME_CACHE = os.getenv("RESUME_CACHE", "true").lower() == "true"
+
+# Text extracted from each resume file, keyed by ResumeSelector._fingerprint (process-wide)
+_RESUME_TEXTS = {}
+
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+# Only the start of each resume is used (500 characters go into the LLM prompt, more for
+# the similarity ranking), so stop extracting there
+RESUME_TEXT_MAX_CHARS = 4000
+
+# Extract resume texts in worker processes once there are at least this many files
+RESUME_POOL_MIN_FILES = 3
+
+# Shared by every request (websites, Ollama, OpenAI) so connections are kept alive between calls
+_SESSION = requests.Session()
+
+# Common tech stack and job skill keywords looked for on company websites
+TECH_KEYWORDS = (
+    "python", "javascript", "java", "c++", "golang", "ruby", "php",
+    "react", "angular", "vue", "node.js", "django", "flask", "spring",
+    "aws", "azure", "gcp", "cloud", "docker", "kubernetes", "ci/cd",
+    "machine learning", "artificial intelligence", "data science", 
+    "deep learning", "neural networks", "nlp", "computer vision",
+    "sql", "nosql", "mongodb", "postgresql", "mysql", "database",
+    "data engineering", "etl", "data warehouse", "big data", "hadoop", "spark",
+    "devops", "sre", "systems", "linux", "unix", "microservices",
+    "agile", "scrum", "kanban", "product management"
+)
+# Zero-width lookahead so every position is tried, longest keyword first; the keywords
+# contained in a match (e.g. "java" in "javascript") are filled in from _KEYWORDS_WITHIN.
+# Case-insensitive, so page text can be scanned without making a lowercased copy
+_TECH_KEYWORDS_RE = re.compile(
+    "(?=(" + "|".join(re.escape(k) for k in sorted(TECH_KEYWORDS, key=len, reverse=True)) + "))",
+    re.IGNORECASE
+)
+_KEYWORDS_WITHIN = {keyword: {k for k in TECH_KEYWORDS if k in keyword} for keyword in TECH_KEYWORDS}
+
+_WHITESPACE_RE = re.compile(r'\s+')
+# Word separators in resume filenames ("data_science-resume.v2")
+_FILENAME_SPLIT_RE = re.compile(r'[\s_\-.]+')
+# "SELECTED_<n>: <file>" and "CONFIDENCE_<n>: <score>" lines of the LLM's answer (n is optional)
+_SELECTED_RE = re.compile(r'SELECTED(?:_(\d+))?:[ \t]*([\w .\-]+\.(?:pdf|docx))', re.IGNORECASE)
+_CONFIDENCE_RE = re.compile(r'CONFIDENCE(?:_(\d+))?:[ \t]*(0\.\d+|1\.0)', re.IGNORECASE)
+
+
+# Words too common to say anything about which resume fits
+_STOP_WORDS = frozenset("""
+a an and are as at be by for from has have i in is it its of on or our that the their this to was we
+were will with you your he she they them his her me my not but so if all can do
+""".split())
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+# Pick a resume by its filename alone when it matches this many more job keywords than the runner-up
+FILENAME_KEYWORD_MARGIN = 2
+# Pick a resume by text similarity alone when it beats the runner-up by at least this much
+TFIDF_MARGIN = 0.05
+
+
+def _tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in _STOP_WORDS]
+
+
+def _normalize(weights: Dict[str, float]) -> Dict[str, float]:
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    return {term: w / norm for term, w in weights.items()} if norm else {}
+
+
+@lru_cache(maxsize=8)
+def _resume_index(texts: Tuple[str, ...]):
+    """TF-IDF weights for a set of resume texts: (idf per term, unit vector per resume)"""
+    counts = [Counter(_tokenize(text)) for text in texts]
+    doc_freq = Counter(term for count in counts for term in count)
+    # Smoothed IDF, so a term in every resume still counts a little
+    idf = {term: math.log((1 + len(texts)) / (1 + df)) + 1 for term, df in doc_freq.items()}
+    vectors = [_normalize({term: tf * idf[term] for term, tf in count.items()}) for count in counts]
+    return idf, vectors
+
+
+def rank_resumes_tfidf(query: str, texts: Tuple[str, ...]) -> List[float]:
+    """Cosine similarity between the query and each resume text, using TF-IDF weights"""
+    idf, vectors = _resume_index(texts)
+    query_vector = _normalize({term: tf * idf[term] for term, tf in Counter(_tokenize(query)).items()
+                               if term in idf})
+    return [sum(w * vector.get(term, 0.0) for term, w in query_vector.items()) for vector in vectors]
+
+
+# Module-level so they can run in ProcessPoolExecutor workers
+def _extract_resume_text(resume_file: Path) -> Tuple[Optional[str], bool]:
+    """Extract the text of one resume
+    
+    Returns (text, fallback): text is None if the format isn't supported, and fallback is True
+    when the filename stands in for text that couldn't be extracted (so it mustn't be cached).
+    """
+    file_extension = resume_file.suffix.lower()
+    if file_extension == '.pdf':
+        return _extract_pdf_text(resume_file, RESUME_TEXT_MAX_CHARS)
+    if file_extension == '.docx':
+        return _extract_docx_text(resume_file, RESUME_TEXT_MAX_CHARS)
+    return None, False
+
+
+def _filename_text(path: Path) -> Tuple[str, bool]:
+    """The filename as stand-in resume text, flagged as a fallback"""
+    return path.stem.replace("_", " ").replace("-", " "), True
+
+
+def _join_until(parts, max_chars: int) -> str:
+    """Join lines of text with newlines, stopping once max_chars have been collected"""
+    collected, length = [], 0
+    for part in parts:
+        collected.append(part)
+        length += len(part) + 1
+        if length >= max_chars:
+            break
+    return "\n".join(collected)[:max_chars]
+
+
+def _extract_pdf_text(pdf_path: Path, max_chars: int = RESUME_TEXT_MAX_CHARS) -> Tuple[str, bool]:
+    """Extract (up to max_chars of) text from PDF file using PyPDF2, reading only the pages needed
+    
+    Returns (text, fallback), as _extract_resume_text does.
+    """
+    # Fall back to using filename for keywords if PyPDF2 not installed
+    if not _HAS_PYPDF2:
+        logger.warning("PyPDF2 not installed. Using filename for analysis.")
+        return _filename_text(pdf_path)
+    try:
+        with open(pdf_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file, strict=False)
+            return _join_until((page.extract_text() or "" for page in reader.pages), max_chars), False
+    except Exception as e:
+        logger.error(f"Error in PDF extraction: {str(e)}")
+        return _filename_text(pdf_path)
+
+
+def _extract_docx_text(docx_path: Path, max_chars: int = RESUME_TEXT_MAX_CHARS) -> Tuple[str, bool]:
+    """Extract (up to max_chars of) text from DOCX file using python-docx
+    
+    Returns (text, fallback), as _extract_resume_text does.
+    """
+    # Fall back to using filename for keywords if docx not installed
+    if not _HAS_DOCX:
+        logger.warning("python-docx not installed. Using filename for analysis.")
+        return _filename_text(docx_path)
+    try:
+        doc = docx.Document(docx_path)
+        return _join_until((para.text for para in doc.paragraphs), max_chars), False
+    except Exception as e:
+        logger.error(f"Error in DOCX extraction: {str(e)}")
+        return _filename_text(docx_path)
+
 
 class ResumeSelector:
     """Select the best resume based on company info and job requirements"""
@@ -34,6 +214,8 @@ class ResumeSelector:
         self.use_local_llm = USE_LOCAL_LLM
         self.local_model = LOCAL_LLM_MODEL
         self.openai_api_key = OPENAI_API_KEY
+        self._ollama_ok = None
+        self.use_cache = USE_RESUME_CACHE
         
         # Ensure resume directory exists
         if not self.resume_dir.exists():
@@ -43,52 +225,97 @@ class ResumeSelector:
     
     def get_available_resumes(self) -> List[Path]:
         """Get list of available resume files"""
-        resume_files = list(self.resume_dir.glob("*.pdf"))
-        resume_files.extend(self.resume_dir.glob("*.docx"))
+        # One directory pass for both formats; PDFs first, as before
+        with os.scandir(self.resume_dir) as entries:
+            resume_files = [Path(entry.path) for entry in entries
+                            if entry.name.endswith(RESUME_EXTENSIONS) and entry.is_file()]
+        resume_files.sort(key=lambda f: RESUME_EXTENSIONS.index(f.suffix))
         logger.info(f"Found {len(resume_files)} resume files: {[f.name for f in resume_files]}")
         return resume_files
     
+    def _cache_path(self, kind: str, key: str) -> Path:
+        """Return the on-disk cache file for a website ("website"), LLM prompt ("llm") or resume file ("resume-text")"""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+        return RESUME_CACHE_DIR / f"{kind}-{digest}.json"
+    
+    def _load_cached(self, kind: str, key: str):
+        """Return the cached value for a key, or None if caching is off or it's missing or expired"""
+        if not self.use_cache:
+            return None
+        try:
+            cached = orjson.loads(self._cache_path(kind, key).read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        ttl = cached.get("ttl", RESUME_CACHE_TTL)
+        if ttl is not None and time.time() - cached.get("cached_at", 0) > ttl:
+            return None
+        return cached.get("value")
+    
+    def _save_cached(self, kind: str, key: str, value, ttl: Optional[int] = RESUME_CACHE_TTL):
+        """Store a value in the on-disk cache (ttl=None keeps it until the key changes)"""
+        if not self.use_cache:
+            return
+        try:
+            RESUME_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(self._cache_path(kind, key), "wb") as f:
+                f.write(orjson.dumps({"cached_at": time.time(), "ttl": ttl, "value": value}))
+        except OSError as e:
+            logger.warning(f"Could not write resume selector cache: {str(e)}")
+    
     def analyze_website(self, website_url: str) -> Dict:
         """Scrape and analyze company website for relevant information"""
+        cache_key = website_url.strip().lower().rstrip('/')
+        cached = self._load_cached("website", cache_key)
+        if cached is not None:
+            logger.info(f"Using cached analysis for website: {website_url}")
+            return cached
+        
         try:
             logger.info(f"Analyzing website: {website_url}")
             
             headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+                # requests sends this by default, but say it explicitly in case a proxy rewrites the defaults
+                "Accept-Encoding": "gzip, deflate"
             }
             
             # Check if URL has protocol
             if not website_url.startswith('http'):
                 website_url = f"https://{website_url}"
             
-            response = requests.get(website_url, headers=headers, timeout=15)
-            response.raise_for_status()
+            html = bytearray()
+            with _SESSION.get(website_url, headers=headers, timeout=15, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=65536):
+                    html += chunk
+                    if len(html) >= MAX_WEBSITE_BYTES:
+                        break
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # Parse with selectolax (C) and drop script/style tags
+            tree = HTMLParser(bytes(html))
+            tree.strip_tags(['script', 'style'])
             
-            # Extract main content and remove script/style tags
-            for script in soup(['script', 'style']):
-                script.extract()
-                
             # Get text content
-            text = soup.get_text(separator=' ', strip=True)
+            text = tree.root.text(separator=' ', strip=True) if tree.root else ""
             
             # Clean up whitespace
-            text = re.sub(r'\s+', ' ', text).strip()
+            text = _WHITESPACE_RE.sub(' ', text).strip()
             
             # Extract job-related keywords
             keywords = self._extract_job_keywords(text)
             
             # Limit text to reasonable length for LLM processing
-            if len(text) > 8000:
-                text = text[:8000] + "..."
+            if len(text) > MAX_WEBSITE_TEXT:
+                text = text[:MAX_WEBSITE_TEXT] + "..."
             
             logger.info(f"Website analysis complete. Extracted {len(keywords)} keywords.")
             
-            return {
+            analysis = {
                 "text": text,
                 "keywords": keywords
             }
+            self._save_cached("website", cache_key, analysis)
+            return analysis
         except Exception as e:
             logger.error(f"Error analyzing website: {str(e)}")
             return {
@@ -98,105 +325,91 @@ class ResumeSelector:
     
     def _extract_job_keywords(self, text: str) -> List[str]:
         """Extract job-related keywords from website text"""
-        # Common tech stack and job skill keywords
-        tech_keywords = [
-            "python", "javascript", "java", "c++", "golang", "ruby", "php",
-            "react", "angular", "vue", "node.js", "django", "flask", "spring",
-            "aws", "azure", "gcp", "cloud", "docker", "kubernetes", "ci/cd",
-            "machine learning", "artificial intelligence", "data science", 
-            "deep learning", "neural networks", "nlp", "computer vision",
-            "sql", "nosql", "mongodb", "postgresql", "mysql", "database",
-            "data engineering", "etl", "data warehouse", "big data", "hadoop", "spark",
-            "devops", "sre", "systems", "linux", "unix", "microservices",
-            "agile", "scrum", "kanban", "product management"
-        ]
-        
-        # Find all matches in text (case insensitive)
-        found_keywords = []
-        text_lower = text.lower()
-        
-        for keyword in tech_keywords:
-            if keyword.lower() in text_lower:
-                found_keywords.append(keyword)
-        
-        return found_keywords
+        # One case-insensitive pass over the text finds every keyword occurrence
+        found = set()
+        for match in _TECH_KEYWORDS_RE.finditer(text):
+            found.update(_KEYWORDS_WITHIN[match.group(1).lower()])
+        return [keyword for keyword in TECH_KEYWORDS if keyword in found]
     
     def extract_resume_texts(self, resume_files: List[Path]) -> Dict[str, str]:
-        """Extract text content from resume files"""
+        """Extract text content from resume files (in parallel worker processes when there are several)"""
         resume_texts = {}
         
-        for resume_file in resume_files:
+        # Resumes that haven't changed since they were last extracted come from the cache
+        fingerprints = [self._fingerprint(resume_file) for resume_file in resume_files]
+        outcomes = [(self._load_resume_text(fingerprint), False, None) for fingerprint in fingerprints]
+        pending = [i for i, (text, _, _) in enumerate(outcomes) if text is None]
+        
+        if len(pending) >= RESUME_POOL_MIN_FILES:
+            workers = min(len(pending), os.cpu_count() or 1)
+            # PDF/DOCX parsing is pure-Python CPU work, so it needs processes to run in parallel. They
+            # are spawned, not forked: forking main.py's multithreaded process can deadlock the child
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = {i: pool.submit(_extract_resume_text, resume_files[i]) for i in pending}
+                for i, future in futures.items():
+                    outcomes[i] = self._outcome(future)
+        else:
+            for i in pending:
+                outcomes[i] = self._outcome(resume_files[i])
+        
+        # Filename stand-ins aren't cached, so a missing extractor or a one-off read error is retried next time
+        for i in pending:
+            text, fallback, error = outcomes[i]
+            if text is not None and not fallback and error is None:
+                self._save_resume_text(fingerprints[i], text)
+        
+        # Outcomes are in the same order as resume_files
+        for resume_file, (text, _, error) in zip(resume_files, outcomes):
             filename = resume_file.name
-            file_extension = resume_file.suffix.lower()
-            
-            try:
-                if file_extension == '.pdf':
-                    text = self._extract_pdf_text(resume_file)
-                    resume_texts[filename] = text
-                elif file_extension == '.docx':
-                    text = self._extract_docx_text(resume_file)
-                    resume_texts[filename] = text
-                else:
-                    logger.warning(f"Unsupported file format: {file_extension}")
-                    continue
-                    
-                logger.info(f"Successfully extracted text from {filename}")
-                
-            except Exception as e:
-                logger.error(f"Error extracting text from {filename}: {str(e)}")
+            if error is not None:
+                logger.error(f"Error extracting text from {filename}: {str(error)}")
                 resume_texts[filename] = f"[Error extracting content from {filename}]"
+            elif text is None:
+                logger.warning(f"Unsupported file format: {resume_file.suffix.lower()}")
+            else:
+                resume_texts[filename] = text
+                logger.info(f"Successfully extracted text from {filename}")
         
         return resume_texts
     
-    def _extract_pdf_text(self, pdf_path: Path) -> str:
-        """Extract text from PDF file using PyPDF2"""
-        try:
-            # Using simple filename-based analysis if PyPDF2 not installed
-            try:
-                import PyPDF2
-                text = ""
-                with open(pdf_path, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    for page_num in range(len(reader.pages)):
-                        text += reader.pages[page_num].extract_text() + "\n"
-                return text
-            except ImportError:
-                # Fall back to using filename for keywords if PyPDF2 not installed
-                logger.warning("PyPDF2 not installed. Using filename for analysis.")
-                return pdf_path.stem.replace("_", " ").replace("-", " ")
-        except Exception as e:
-            logger.error(f"Error in PDF extraction: {str(e)}")
-            return pdf_path.stem.replace("_", " ").replace("-", " ")
+    @staticmethod
+    def _fingerprint(resume_file: Path) -> str:
+        """Identify a resume file's current contents by path, size and modification time"""
+        stat = resume_file.stat()
+        return f"{resume_file.resolve()}\x00{stat.st_size}\x00{stat.st_mtime_ns}\x00{RESUME_TEXT_MAX_CHARS}"
     
-    def _extract_docx_text(self, docx_path: Path) -> str:
-        """Extract text from DOCX file using python-docx"""
+    def _load_resume_text(self, fingerprint: str) -> Optional[str]:
+        """Return the text extracted earlier from an identical resume file, if any"""
+        if fingerprint in _RESUME_TEXTS:
+            return _RESUME_TEXTS[fingerprint]
+        text = self._load_cached("resume-text", fingerprint)
+        if text is not None:
+            _RESUME_TEXTS[fingerprint] = text
+        return text
+    
+    def _save_resume_text(self, fingerprint: str, text: str):
+        """Remember the text extracted from a resume file"""
+        _RESUME_TEXTS[fingerprint] = text
+        # The fingerprint changes whenever the file does, so the entry never needs to expire
+        self._save_cached("resume-text", fingerprint, text, ttl=None)
+    
+    @staticmethod
+    def _outcome(job) -> Tuple[Optional[str], bool, Optional[Exception]]:
+        """Run (or collect) one extraction; returns (text, fallback, error)"""
         try:
-            # Using simple filename-based analysis if docx not installed
-            try:
-                import docx
-                doc = docx.Document(docx_path)
-                text = "\n".join([para.text for para in doc.paragraphs])
-                return text
-            except ImportError:
-                # Fall back to using filename for keywords if docx not installed
-                logger.warning("python-docx not installed. Using filename for analysis.")
-                return docx_path.stem.replace("_", " ").replace("-", " ")
+            text, fallback = job.result() if isinstance(job, Future) else _extract_resume_text(job)
+            return text, fallback, None
         except Exception as e:
-            logger.error(f"Error in DOCX extraction: {str(e)}")
-            return docx_path.stem.replace("_", " ").replace("-", " ")
+            return None, False, e
     
     def check_ollama_available(self) -> bool:
-        """Check if Ollama is available and running"""
-        try:
-            result = subprocess.run(
-                ["ollama", "list"], 
-                capture_output=True, 
-                text=True, 
-                timeout=5
-            )
-            return result.returncode == 0
-        except (subprocess.SubprocessError, FileNotFoundError):
-            return False
+        """Check if the Ollama server is running (checked once per selector)"""
+        if self._ollama_ok is None:
+            try:
+                self._ollama_ok = _SESSION.get(f"{OLLAMA_URL}/api/tags", timeout=5).ok
+            except requests.RequestException:
+                self._ollama_ok = False
+        return self._ollama_ok
     
     def select_best_resume(self, 
                           company_name: str,
@@ -217,6 +430,27 @@ class ResumeSelector:
         Returns:
             Tuple of (selected resume file path, confidence score)
         """
+        return self.select_best_resume_batch([{
+            "company_name": company_name,
+            "industry": industry,
+            "job_keywords": job_keywords,
+            "email_content": email_content,
+            "ceo_name": ceo_name
+        }])[0]
+    
+    def select_best_resume_batch(self, leads: List[Dict]) -> List[Tuple[Path, float]]:
+        """
+        Select the best resume for several leads at once
+        
+        Leads that filename keywords or text similarity can't decide are sent to the LLM
+        together, in one prompt that lists the resumes only once.
+        
+        Args:
+            leads: Dicts of select_best_resume keyword arguments, one per lead
+            
+        Returns:
+            List of (selected resume file path, confidence score), in the same order as `leads`
+        """
         # Get available resumes
         resume_files = self.get_available_resumes()
         if not resume_files:
@@ -226,122 +460,198 @@ class ResumeSelector:
         # If only one resume available, return it
         if len(resume_files) == 1:
             logger.info(f"Only one resume available, selecting: {resume_files[0].name}")
-            return (resume_files[0], 1.0)
+            return [(resume_files[0], 1.0)] * len(leads)
         
-        # Extract text from resumes - simplified approach if extraction libraries not installed
-        try:
-            resume_texts = self.extract_resume_texts(resume_files)
-        except Exception as e:
-            logger.error(f"Error extracting resume texts: {str(e)}")
-            # Fallback to simple filename-based matching
-            resume_texts = {f.name: f.stem.replace("_", " ").replace("-", " ") for f in resume_files}
+        leads = [{
+            "company_name": lead["company_name"],
+            "industry": lead.get("industry") or "",
+            "job_keywords": lead.get("job_keywords") or [],
+            "email_content": lead.get("email_content") or "",
+            "ceo_name": lead.get("ceo_name") or ""
+        } for lead in leads]
+        results = [None] * len(leads)
         
-        if not job_keywords:
-            job_keywords = []
+        # Cheapest pass: a filename that matches clearly more keywords than the rest wins
+        # without opening any resume or asking the LLM
+        filename_scores = [self._filename_keyword_scores(resume_files, lead["job_keywords"]) for lead in leads]
+        for i, scores in enumerate(filename_scores):
+            ranked = sorted(scores, key=lambda x: x[1], reverse=True)
+            if ranked[0][1] > 0 and ranked[0][1] - ranked[1][1] >= FILENAME_KEYWORD_MARGIN:
+                best_file, best_score = ranked[0]
+                logger.info(f"Selected resume by filename keywords: {best_file.name} ({best_score} keywords)")
+                results[i] = (best_file, min(0.9, 0.5 + 0.1 * best_score))
+        pending = [i for i, result in enumerate(results) if result is None]
         
+        if pending:
+            # Extract text from resumes - simplified approach if extraction libraries not installed
+            try:
+                resume_texts = self.extract_resume_texts(resume_files)
+            except Exception as e:
+                logger.error(f"Error extracting resume texts: {str(e)}")
+                # Fallback to simple filename-based matching
+                resume_texts = {f.name: f.stem.replace("_", " ").replace("-", " ") for f in resume_files}
+            
+            # Next: if one resume is clearly the closest match by text, skip the LLM
+            for i in pending:
+                results[i] = self._select_by_similarity(resume_files, resume_texts, leads[i])
+            pending = [i for i in pending if results[i] is None]
+        
+        if pending:
+            # Ask the LLM about all the remaining leads at once
+            prompt = self._build_selection_prompt(resume_texts, [leads[i] for i in pending])
+            selections = self._parse_selections(self._get_llm_response(prompt), resume_files, len(pending))
+            for number, i in enumerate(pending, 1):
+                results[i] = selections.get(number)
+        
+        for i, result in enumerate(results):
+            if result is not None:
+                continue
+            
+            # Fallback: If we couldn't select a specific resume with LLM, try keyword matching
+            best_match = max(filename_scores[i], key=lambda x: x[1])
+            if best_match[1] > 0:
+                logger.info(f"Selected resume using keyword matching: {best_match[0].name}")
+                results[i] = (best_match[0], 0.6)
+            else:
+                # If all else fails, return the first resume
+                logger.warning("Could not determine best resume, selecting first available")
+                results[i] = (resume_files[0], 0.5)
+        
+        return results
+    
+    @staticmethod
+    def _select_by_similarity(resume_files: List[Path], resume_texts: Dict[str, str],
+                              lead: Dict) -> Optional[Tuple[Path, float]]:
+        """Pick the resume whose text is clearly closest to the lead (TF-IDF), or None if it's a close call"""
+        if len(resume_texts) < 2:
+            return None
+        query = " ".join([lead["company_name"], lead["industry"], " ".join(lead["job_keywords"]), lead["email_content"]])
+        similarities = rank_resumes_tfidf(query, tuple(resume_texts.values()))
+        ranked = sorted(zip(similarities, resume_texts), reverse=True)
+        (top_score, top_name), (runner_up_score, _) = ranked[0], ranked[1]
+        if top_score - runner_up_score < TFIDF_MARGIN:
+            return None
+        resume_file = next(f for f in resume_files if f.name == top_name)
+        logger.info(f"Selected resume by text similarity: {resume_file.name} (score {top_score:.2f})")
+        return (resume_file, round(top_score, 2))
+    
+    @staticmethod
+    def _build_selection_prompt(resume_texts: Dict[str, str], leads: List[Dict]) -> str:
+        """Render one LLM prompt asking for the best resume for each lead"""
         # Prepare prompt for LLM
         resume_options = "\n\n".join([
             f"RESUME {i+1}: {filename}\n{text[:500]}..." 
             for i, (filename, text) in enumerate(resume_texts.items())
         ])
-        
-        prompt = f"""
-I need to select the most appropriate resume to send to {company_name} from several options.
-
-COMPANY: {company_name}
-INDUSTRY: {industry}
-CEO/FOUNDER: {ceo_name}
-RELEVANT KEYWORDS: {', '.join(job_keywords)}
-
+        companies = "\n\n".join([
+            f"""COMPANY {number}: {lead['company_name']}
+INDUSTRY: {lead['industry']}
+CEO/FOUNDER: {lead['ceo_name']}
+RELEVANT KEYWORDS: {', '.join(lead['job_keywords'])}
 EMAIL CONTENT TO BE SENT:
-{email_content[:500]}...
+{lead['email_content'][:500]}..."""
+            for number, lead in enumerate(leads, 1)
+        ])
+        
+        return f"""
+I need to select the most appropriate resume to send to each of the companies below from several options.
 
 AVAILABLE RESUMES:
 {resume_options}
 
-Based on the company's industry, keywords, and the email content, which resume would be the MOST appropriate to send?
+{companies}
+
+For each company, based on its industry, keywords, and the email content, which resume would be the MOST appropriate to send?
 Analyze how well each resume matches the company's needs and industry.
 
-Your response must be in this exact format:
-SELECTED: [filename]
-CONFIDENCE: [score between 0.0-1.0]
+Your response must contain these two lines for every company, where N is the company's number:
+SELECTED_N: [filename]
+CONFIDENCE_N: [score between 0.0-1.0]
 """
+    
+    @staticmethod
+    def _parse_selections(response_text: Optional[str], resume_files: List[Path],
+                          count: int) -> Dict[int, Tuple[Path, float]]:
+        """Parse the LLM's SELECTED_N/CONFIDENCE_N lines into {company number: (resume, confidence)}"""
+        if not response_text:
+            return {}
         
-        # Get response from LLM
-        response_text = self._get_llm_response(prompt)
-        
-        # Parse response to extract selected resume
-        if response_text:
-            try:
-                # Extract selected resume
-                selected_match = re.search(r'SELECTED:\s*([\w\s\.\-]+\.(?:pdf|docx))', response_text, re.IGNORECASE)
-                confidence_match = re.search(r'CONFIDENCE:\s*(0\.\d+|1\.0)', response_text)
-                
-                if selected_match:
-                    selected_filename = selected_match.group(1).strip()
-                    confidence = float(confidence_match.group(1)) if confidence_match else 0.5
-                    
-                    # Find the matching resume file
-                    for resume_file in resume_files:
-                        if resume_file.name.lower() == selected_filename.lower():
-                            logger.info(f"Selected resume: {resume_file.name} with confidence {confidence}")
-                            return (resume_file, confidence)
-                    
-                    # If exact filename not found, try partial match
-                    for resume_file in resume_files:
-                        if selected_filename.lower() in resume_file.name.lower():
-                            logger.info(f"Selected resume (partial match): {resume_file.name}")
-                            return (resume_file, confidence)
-            except Exception as e:
-                logger.error(f"Error parsing LLM response: {str(e)}")
+        # Without a number the answer can only be about the single company asked about
+        def number(match):
+            return int(match.group(1)) if match.group(1) else (1 if count == 1 else None)
         
-        # Fallback: If we couldn't select a specific resume with LLM, try keyword matching
-        if job_keywords:
-            # Simple keyword matching fallback
-            scores = []
-            for resume_file in resume_files:
-                filename_text = resume_file.stem.lower().replace("_", " ").replace("-", " ")
-                score = sum(1 for keyword in job_keywords if keyword.lower() in filename_text)
-                scores.append((resume_file, score))
+        confidences = {number(m): float(m.group(2)) for m in _CONFIDENCE_RE.finditer(response_text)}
+        selections = {}
+        for match in _SELECTED_RE.finditer(response_text):
+            company = number(match)
+            if company is None or not 1 <= company <= count or company in selections:
+                continue
+            selected_filename = match.group(2).strip().lower()
+            confidence = confidences.get(company, 0.5)
             
-            # Get resume with highest keyword match
-            if scores:
-                best_match = max(scores, key=lambda x: x[1])
-                if best_match[1] > 0:
-                    logger.info(f"Selected resume using keyword matching: {best_match[0].name}")
-                    return (best_match[0], 0.6)
+            # Find the matching resume file, or failing that a partial match
+            resume_file = next((f for f in resume_files if f.name.lower() == selected_filename), None)
+            if resume_file is None:
+                resume_file = next((f for f in resume_files if selected_filename in f.name.lower()), None)
+            if resume_file is not None:
+                logger.info(f"Selected resume: {resume_file.name} with confidence {confidence}")
+                selections[company] = (resume_file, confidence)
+        return selections
+    
+    @staticmethod
+    def _filename_keyword_scores(resume_files: List[Path], job_keywords: List[str]) -> List[Tuple[Path, int]]:
+        """Count how many of the job keywords appear in each resume's filename
         
-        # If all else fails, return the first resume
-        logger.warning("Could not determine best resume, selecting first available")
-        return (resume_files[0], 0.5)
+        Short keywords ("go", "ml") must be whole words so they don't match inside other words;
+        longer ones also match with spaces dropped, so "data science" finds "Datascience".
+        """
+        keywords_lower = {keyword.lower().strip() for keyword in job_keywords}
+        short = {keyword for keyword in keywords_lower if keyword and len(keyword) <= 3}
+        long = [keyword for keyword in keywords_lower if len(keyword) > 3]
+        scores = []
+        for resume_file in resume_files:
+            stem = resume_file.stem.lower()
+            tokens = _FILENAME_SPLIT_RE.split(stem)
+            joined = "".join(tokens)
+            score = len(short.intersection(tokens))
+            score += sum(1 for keyword in long if keyword in stem or _FILENAME_SPLIT_RE.sub("", keyword) in joined)
+            scores.append((resume_file, score))
+        return scores
     
     def _get_llm_response(self, prompt: str) -> str:
         """Get response from LLM using either local Ollama or OpenAI API"""
-        response_text = None
+        cache_key = f"{self.local_model}\x00{prompt}"
+        response_text = self._load_cached("llm", cache_key)
+        if response_text:
+            logger.info("Using cached LLM response")
+            return response_text
         
         # Try local LLM first if available
         if self.use_local_llm and self.check_ollama_available():
             try:
                 logger.info(f"Using local LLM ({self.local_model}) to select resume...")
-                result = subprocess.run(
-                    ["ollama", "run", self.local_model, prompt],
-                    capture_output=True,
-                    text=True,
+                response = _SESSION.post(
+                    f"{OLLAMA_URL}/api/generate",
+                    json={
+                        "model": self.local_model,
+                        "prompt": prompt,
+                        "stream": False,
+                        "keep_alive": OLLAMA_KEEP_ALIVE
+                    },
                     timeout=120
                 )
                 
-                if result.returncode == 0:
-                    response_text = result.stdout.strip()
+                if response.status_code == 200:
+                    response_text = response.json()["response"].strip()
                     logger.info("Successfully got response from local LLM")
                 else:
-                    logger.error(f"Error from local LLM: {result.stderr}")
+                    logger.error(f"Error from local LLM: {response.text}")
             except Exception as e:
                 logger.error(f"Error using local LLM: {str(e)}")
         
         # Fall back to OpenAI if needed and configured
         if not response_text and self.openai_api_key:
             try:
-                import requests
                 logger.info("Falling back to OpenAI API...")
                 
                 headers = {
@@ -359,10 +669,11 @@ CONFIDENCE: [score between 0.0-1.0]
                     "max_tokens": 500
                 }
                 
-                response = requests.post(
+                response = _SESSION.post(
                     "https://api.openai.com/v1/chat/completions",
                     headers=headers,
-                    json=payload
+                    json=payload,
+                    timeout=60
                 )
                 
                 if response.status_code == 200:
@@ -376,11 +687,27 @@ CONFIDENCE: [score between 0.0-1.0]
         
         if not response_text:
             logger.warning("Could not get LLM response, will use default selection")
+        else:
+            self._save_cached("llm", cache_key, response_text)
             
         return response_text
 
 
-def select_resume(company_name, company_website=None, ceo_name=None, industry=None, email_content=None, role_hint=None):
+def website_keywords(company_website):
+    """Keywords from a company's website, or [] if it can't be analyzed
+    
+    Lets callers fetch the website ahead of time (e.g. while the email is being
+    generated) and hand the result to select_resume.
+    """
+    try:
+        return ResumeSelector().analyze_website(company_website)["keywords"]
+    except Exception as e:
+        logger.error(f"Error analyzing website: {str(e)}")
+        return []
+
+
+def select_resume(company_name, company_website=None, ceo_name=None, industry=None, email_content=None, role_hint=None,
+                  company_keywords=None):
     """
     Select the best resume based on company information
     
@@ -391,41 +718,60 @@ def select_resume(company_name, company_website=None, ceo_name=None, industry=No
     - industry: str (optional)
     - email_content: str (optional)
     - role_hint: str (optional) - e.g., "data science", "frontend", etc.
+    - company_keywords: list (optional) - website_keywords(company_website), if already fetched
     
     Returns:
     - best_fit_resume: str (path to resume file)
     - confidence: float (0.0-1.0 score of match confidence)
     """
+    return select_resumes([{
+        "company_name": company_name,
+        "company_website": company_website,
+        "ceo_name": ceo_name,
+        "industry": industry,
+        "email_content": email_content,
+        "role_hint": role_hint,
+        "company_keywords": company_keywords
+    }])[0]
+
+
+def select_resumes(leads):
+    """
+    Select the best resume for several leads (e.g. every contact at a company) at once
+    
+    Leads the quick checks can't decide share a single LLM request instead of one each.
+    
+    Inputs:
+    - leads: list of dicts of select_resume keyword arguments
+    
+    Returns:
+    - list of (best_fit_resume, confidence) tuples, in the same order as leads
+    """
     selector = ResumeSelector()
     
-    # Extract keywords from website if available
-    job_keywords = []
-    if role_hint:
-        job_keywords.append(role_hint)
+    batch = []
+    for lead in leads:
+        # Keywords from the role hint (whole and word by word) and the website, without duplicates;
+        # a dict rather than a set keeps them in a stable order, so the LLM prompt (and its cache key) is too
+        job_keywords = {}
+        role_hint = lead.get("role_hint")
+        if role_hint:
+            job_keywords.update(dict.fromkeys([role_hint, *role_hint.split()]))
         
-    if company_website:
-        try:
-            website_info = selector.analyze_website(company_website)
-            if website_info["keywords"]:
-                job_keywords.extend(website_info["keywords"])
-        except Exception as e:
-            logger.error(f"Error analyzing website: {str(e)}")
-    
-    # Add role hint as a keyword if provided
-    if role_hint:
-        keywords = role_hint.split()
-        job_keywords.extend(keywords)
-    
-    # Select best resume
-    resume_path, confidence = selector.select_best_resume(
-        company_name=company_name,
-        industry=industry or "",
-        job_keywords=job_keywords,
-        email_content=email_content or "",
-        ceo_name=ceo_name or ""
-    )
+        company_keywords = lead.get("company_keywords")
+        if company_keywords is None and lead.get("company_website"):
+            company_keywords = website_keywords(lead["company_website"])
+        job_keywords.update(dict.fromkeys(company_keywords or []))
+        
+        batch.append({
+            "company_name": lead["company_name"],
+            "industry": lead.get("industry") or "",
+            "job_keywords": list(job_keywords),
+            "email_content": lead.get("email_content") or "",
+            "ceo_name": lead.get("ceo_name") or ""
+        })
     
-    return str(resume_path), confidence
+    return [(str(resume_path), confidence) for resume_path, confidence in selector.select_best_resume_batch(batch)]
 
 
 # Command-line interface
@@ -1,5 +1,9 @@
 import smtplib
 import os
+import copy
+import threading
+import time
+from functools import lru_cache
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
@@ -11,9 +15,25 @@ EMAIL = os.getenv("EMAIL_ADDRESS")
 PASSWORD = os.getenv("EMAIL_PASSWORD")
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+# Temporary SMTP failures (service unavailable, mailbox busy, TLS unavailable) are retried with backoff
+RETRYABLE_SMTP_CODES = {421, 450, 454}
+SMTP_MAX_RETRIES = 3
 
-def send_email(recipient_email, subject, body_text, attachment_path=None):
-    """Send email with optional attachment"""
+
+@lru_cache(maxsize=32)
+def _encoded_attachment(path, size, mtime_ns):
+    """Read and base64-encode an attachment once per version of the file
+    
+    size and mtime_ns are only part of the cache key, so an edited file is re-read.
+    """
+    with open(path, 'rb') as file:
+        attachment = MIMEApplication(file.read(), Name=os.path.basename(path))
+    attachment['Content-Disposition'] = f'attachment; filename="{os.path.basename(path)}"'
+    return attachment
+
+
+def build_message(recipient_email, subject, body_text, attachment_path=None):
+    """Build the MIME message for one email with optional attachment"""
     # Create message
     msg = MIMEMultipart()
     msg['From'] = EMAIL
@@ -24,21 +44,135 @@ def send_email(recipient_email, subject, body_text, attachment_path=None):
     msg.attach(MIMEText(body_text))
     
     # Add attachment if provided
+    # (the same resume usually goes to many recipients, so its encoded part is cached)
     if attachment_path and os.path.exists(attachment_path):
-        with open(attachment_path, 'rb') as file:
-            attachment = MIMEApplication(file.read(), Name=os.path.basename(attachment_path))
-            attachment['Content-Disposition'] = f'attachment; filename="{os.path.basename(attachment_path)}"'
-            msg.attach(attachment)
+        stat = os.stat(attachment_path)
+        attachment = _encoded_attachment(os.path.abspath(attachment_path), stat.st_size, stat.st_mtime_ns)
+        msg.attach(copy.deepcopy(attachment))
+    
+    return msg
+
+
+class EmailSender:
+    """Keeps one logged-in SMTP connection open for sending several emails
+    
+    with EmailSender() as sender:
+        for lead in leads:
+            sender.send(lead["email"], subject, body)
+    """
+    
+    def __init__(self):
+        self.server = None
+    
+    def connect(self):
+        """Open the SMTP connection and log in"""
+        self.server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+        self.server.starttls()
+        self.server.login(EMAIL, PASSWORD)
+    
+    def close(self):
+        """Log out and close the connection"""
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except smtplib.SMTPException:
+                self.server.close()
+            self.server = None
+    
+    def __enter__(self):
+        self.connect()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
     
-    # Send email
+    def _send_message(self, msg):
+        try:
+            if self.server is None:
+                self.connect()
+            self.server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped an idle connection - log in again and retry once
+            self.server = None
+            self.connect()
+            self.server.send_message(msg)
+    
+    def send(self, recipient_email, subject, body_text, attachment_path=None):
+        """Send email with optional attachment over the open connection"""
+        try:
+            msg = build_message(recipient_email, subject, body_text, attachment_path)
+            for attempt in range(SMTP_MAX_RETRIES + 1):
+                try:
+                    self._send_message(msg)
+                    break
+                except smtplib.SMTPResponseException as e:
+                    if e.smtp_code not in RETRYABLE_SMTP_CODES or attempt == SMTP_MAX_RETRIES:
+                        raise
+                    delay = 2 ** attempt
+                    print(f"… SMTP {e.smtp_code}, retrying in {delay}s")
+                    if e.smtp_code == 421:
+                        self.close()  # the server is closing the connection
+                    time.sleep(delay)
+            print(f"✓ Email sent successfully to {recipient_email}")
+            return True
+        except Exception as e:
+            print(f"× Error sending email: {str(e)}")
+            return False
+
+
+class SMTPPool:
+    """Reuses logged-in EmailSenders across concurrent senders
+    
+    A sender is checked out for each email and returned afterwards, so the pool only
+    opens as many connections as there are emails in flight at once.
+    
+    with SMTPPool() as pool:
+        pool.send(lead["email"], subject, body)
+    """
+    
+    def __init__(self):
+        self._idle = []
+        self._senders = []
+        self._lock = threading.Lock()
+    
+    def send(self, recipient_email, subject, body_text, attachment_path=None):
+        """Send over an idle pooled connection, opening a new one if none is free (see EmailSender.send)"""
+        with self._lock:
+            sender = self._idle.pop() if self._idle else None
+        if sender is None:
+            sender = EmailSender()
+            with self._lock:
+                self._senders.append(sender)
+        try:
+            return sender.send(recipient_email, subject, body_text, attachment_path)
+        finally:
+            with self._lock:
+                self._idle.append(sender)
+    
+    def close(self):
+        """Close every connection the pool opened"""
+        with self._lock:
+            senders, self._senders, self._idle = self._senders, [], []
+        for sender in senders:
+            try:
+                sender.close()
+            except Exception:
+                pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def send_email(recipient_email, subject, body_text, attachment_path=None):
+    """Send email with optional attachment (over its own connection)"""
+    sender = EmailSender()
     try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL, PASSWORD)
-        server.send_message(msg)
-        server.quit()
-        print(f"✓ Email sent successfully to {recipient_email}")
-        return True
-    except Exception as e:
-        print(f"× Error sending email: {str(e)}")
-        return False
\ No newline at end of file
+        return sender.send(recipient_email, subject, body_text, attachment_path)
+    finally:
+        try:
+            sender.close()
+        except Exception:
+            pass
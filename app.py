@@ -1,11 +1,13 @@
 import streamlit as st
-import json
+import orjson
 import os
-import time
-import pandas as pd
-import matplotlib.pyplot as plt
+import shutil
 import subprocess
 import sys
+import threading
+from collections import deque
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Page config
@@ -17,34 +19,244 @@ st.set_page_config(
 
 # Define paths
 RESULTS_DIR = Path("outreach_results")
-ALL_RESULTS_FILE = RESULTS_DIR / "all_results.json"
+ALL_RESULTS_FILE = RESULTS_DIR / "all_results.jsonl"  # one result per line, appended as companies finish
 PROGRESS_FILE = RESULTS_DIR / "progress.txt"
+OUTPUT_MAX_LINES = 1000  # live process output kept for the Logs tab
 
 # Create results directory if it doesn't exist
 os.makedirs(RESULTS_DIR, exist_ok=True)
 
 # Helper functions
+# pandas and matplotlib are imported where they're used, so tabs that don't need them (Logs, Settings, ...) don't pay for the import
+def _file_version(path):
+    """(mtime, size) of a file, or None if it doesn't exist - used as a cache key"""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+@st.cache_resource
+def _results_log():
+    """Results parsed so far, shared across sessions so each file change only parses the new lines"""
+    return {"lock": threading.Lock(), "run_id": None, "offset": 0, "records": {}}
+
+@st.cache_data(show_spinner=False)
+def _read_results(version):
+    """Parse the results log, in spreadsheet order; cached until its mtime/size changes"""
+    log = _results_log()
+    with log["lock"], open(ALL_RESULTS_FILE, "rb") as f:
+        # Each run starts the file with a {"run_id": ...} line, so start over when it changes
+        header = f.readline()
+        run_id = orjson.loads(header).get("run_id") if header.endswith(b"\n") else None
+        if run_id is None or run_id != log["run_id"]:
+            log.update(run_id=run_id, offset=len(header) if run_id else 0, records={})
+        f.seek(log["offset"])
+        data = f.read() if run_id else b""
+        
+        # Stop at the last complete line - a half-written one is picked up on the next change
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            # Lines are in completion order; "position" is the company's spreadsheet row
+            log["records"][record.pop("position", len(log["records"]))] = record
+        log["offset"] += end
+        return [log["records"][position] for position in sorted(log["records"])]
+
+@st.cache_data(show_spinner=False)
+def _read_progress(version):
+    """Read the progress log; cached until its mtime/size changes"""
+    with open(PROGRESS_FILE, "r") as f:
+        return f.read()
+
+def _json_entries(directory):
+    """The *.json files in a directory, listed with os.scandir to avoid pathlib's per-file overhead"""
+    try:
+        with os.scandir(directory) as it:
+            return [entry for entry in it if entry.name.endswith(".json") and entry.is_file()]
+    except FileNotFoundError:
+        return []
+
+def _read_bytes(path):
+    """Read a file's bytes, or None if it disappeared or can't be read"""
+    try:
+        return path.read_bytes()
+    except OSError:
+        return None
+
+@st.cache_data(show_spinner=False)
+def _read_contacts(versions):
+    """Collect the key contacts from every company file; cached until any file's mtime/size changes"""
+    paths = [Path(path) for path, _, _ in versions]
+    
+    # Read the files concurrently, then parse them in order
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        contents = list(pool.map(_read_bytes, paths))
+    
+    all_contacts = []
+    for file, raw in zip(paths, contents):
+        try:
+            data = orjson.loads(raw)
+            if "key_contacts" in data:
+                company_name = data.get("company", file.stem)
+                for contact in data["key_contacts"]:
+                    contact["company"] = company_name
+                    all_contacts.append(contact)
+        except Exception:
+            pass
+    return all_contacts
+
+def load_contacts():
+    """Load every contact found so far, tagged with its company"""
+    versions = []
+    for entry in _json_entries(RESULTS_DIR / "contacts"):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        versions.append((entry.path, stat.st_mtime, stat.st_size))
+    return _read_contacts(tuple(sorted(versions)))
+
 def load_results():
     """Load current results from JSON file"""
-    if ALL_RESULTS_FILE.exists():
-        with open(ALL_RESULTS_FILE, "r") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return []
-    return []
+    version = _file_version(ALL_RESULTS_FILE)
+    return _read_results(version) if version else []
+
+@st.cache_data(show_spinner=False)
+def _results_frame(version):
+    """The results as a DataFrame; built once per revision of the results file"""
+    import pandas as pd
+    return pd.DataFrame(_read_results(version))
+
+def _column_total(df, column):
+    return int(df[column].fillna(0).sum()) if column in df.columns else 0
+
+@st.cache_data(show_spinner=False)
+def _summarize_results(version):
+    """Dashboard totals and status breakdown as column reductions; cached until the results file changes"""
+    import pandas as pd
+    df = _results_frame(version)
+    status = df["status"].fillna("unknown") if "status" in df.columns else pd.Series("unknown", index=df.index)
+    return {
+        "companies": len(df),
+        "successful": int(status.isin(["success", "partial"]).sum()),
+        "contacts": _column_total(df, "contacts_processed"),
+        "emails_sent": _column_total(df, "contacts_successful"),
+        "status_counts": {str(k): int(v) for k, v in status.value_counts(sort=False).items()},
+    }
+
+def summarize_results():
+    """Totals for the dashboard metrics and status chart"""
+    version = _file_version(ALL_RESULTS_FILE)
+    if not version:
+        return {"companies": 0, "successful": 0, "contacts": 0, "emails_sent": 0, "status_counts": {}}
+    return _summarize_results(version)
+
+def load_results_frame():
+    """Load current results as a DataFrame"""
+    import pandas as pd
+    version = _file_version(ALL_RESULTS_FILE)
+    return _results_frame(version) if version else pd.DataFrame()
+
+@st.cache_data(show_spinner=False)
+def _status_pie_png(status_items):
+    """Render the company status pie chart to PNG; cached per set of status counts"""
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(5, 5))
+    ax.pie(
+        [count for _, count in status_items], 
+        labels=[status for status, _ in status_items], 
+        autopct='%1.1f%%',
+        colors=['#4CAF50', '#FFC107', '#F44336', '#9C27B0']
+    )
+    ax.set_title("Company Status")
+    buf = BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+STATUS_BADGES = {
+    "success": "🟢 success",
+    "partial": "🟡 partial",
+    "failed": "🔴 failed",
+}
+
+# Rendered natively by st.dataframe, so the table needs no pandas Styler (and no HTML) at all
+RESULTS_COLUMN_CONFIG = {
+    "company": st.column_config.TextColumn("Company"),
+    "status": st.column_config.TextColumn("Status"),
+    "contacts_processed": st.column_config.NumberColumn("Contacts processed"),
+    "contacts_successful": st.column_config.NumberColumn("Successful contacts"),
+}
+
+def _status_badges(status):
+    """Status labels with a coloured marker, looked up for the whole column at once"""
+    return status.map(STATUS_BADGES).fillna(status)
+
+def _pretty_json(value):
+    """Indented JSON for display, serialized with orjson instead of Streamlit's st.json"""
+    return orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode()
+
+def _to_csv(df):
+    """CSV bytes for a DataFrame, written by pyarrow's C++ writer when it's installed"""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        return df.to_csv(index=False)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, ValueError):
+        return df.to_csv(index=False)  # columns Arrow can't type (e.g. mixed values) - let pandas stringify them
+    buf = BytesIO()
+    pa_csv.write_csv(table, buf)
+    return buf.getvalue()
 
 def load_progress():
     """Load the progress log"""
-    if PROGRESS_FILE.exists():
-        with open(PROGRESS_FILE, "r") as f:
-            return f.read()
-    return ""
+    version = _file_version(PROGRESS_FILE)
+    return _read_progress(version) if version else ""
+
+def tail_progress(n_lines=10, block_size=8192):
+    """The last lines of the progress log, reading only the end of the file"""
+    try:
+        with open(PROGRESS_FILE, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            start = max(0, size - block_size)
+            f.seek(start)
+            lines = f.read().decode("utf-8", errors="replace").split("\n")
+    except FileNotFoundError:
+        return ""
+    if start > 0:
+        lines = lines[1:]  # the first line of the block is probably cut off
+    return "\n".join(lines[-n_lines:])
+
+@st.cache_resource
+def _send_email_fn():
+    """Import send_email once per server rather than on every Test Connection click"""
+    sys.path.append(".")
+    from outreach_ai.agents.send_email import send_email
+    return send_email
+
+def _save_upload(uploaded, path):
+    """Stream an uploaded file to disk in 1 MB chunks"""
+    uploaded.seek(0)
+    with open(path, "wb") as f:
+        shutil.copyfileobj(uploaded, f, length=1024 * 1024)
+
+def _tail_output(process, lines):
+    """Collect the process's output lines until it exits (runs on a background thread)"""
+    for line in process.stdout:
+        lines.append(line.rstrip())
+    process.stdout.close()
 
 def run_outreach_process():
     """Run the outreach process in the background"""
     try:
-        st.session_state.process = subprocess.Popen(
+        process = subprocess.Popen(
             [sys.executable, "-m", "outreach_ai.main"],
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
@@ -52,8 +264,12 @@ def run_outreach_process():
             bufsize=1,
             universal_newlines=True
         )
+        # Output is read off the script thread so the page never blocks on the process
+        output_lines = deque(maxlen=OUTPUT_MAX_LINES)
+        threading.Thread(target=_tail_output, args=(process, output_lines), daemon=True).start()
+        st.session_state.process = process
         st.session_state.process_running = True
-        st.session_state.output_lines = []
+        st.session_state.output_lines = output_lines
     except Exception as e:
         st.error(f"Failed to start process: {str(e)}")
         st.session_state.process_running = False
@@ -64,7 +280,7 @@ if 'process_running' not in st.session_state:
 if 'process' not in st.session_state:
     st.session_state.process = None
 if 'output_lines' not in st.session_state:
-    st.session_state.output_lines = []
+    st.session_state.output_lines = deque(maxlen=OUTPUT_MAX_LINES)
 if 'show_tab' not in st.session_state:
     st.session_state.show_tab = "dashboard"
 
@@ -107,7 +323,7 @@ with st.sidebar:
     # When starting the process
     if st.button("Start Process"):
         # Pass filters as environment variables
-        os.environ["EXCLUDED_LOCATIONS"] = json.dumps(excluded_locations)
+        os.environ["EXCLUDED_LOCATIONS"] = orjson.dumps(excluded_locations).decode()
         run_outreach_process()
 
     
@@ -115,8 +331,7 @@ with st.sidebar:
     uploaded_excel = st.file_uploader("Companies Excel", type=["xlsx"])
     if uploaded_excel:
         # Save the uploaded file
-        with open("outreach_ai/data/companies.xlsx", "wb") as f:
-            f.write(uploaded_excel.getbuffer())
+        _save_upload(uploaded_excel, "outreach_ai/data/companies.xlsx")
         st.success("Excel file uploaded successfully!")
     
     with st.expander("Upload Resumes"):
@@ -127,8 +342,7 @@ with st.sidebar:
             
             # Save each uploaded resume
             for resume in uploaded_resume:
-                with open(f"outreach_ai/resumes/{resume.name}", "wb") as f:
-                    f.write(resume.getbuffer())
+                _save_upload(resume, f"outreach_ai/resumes/{resume.name}")
             st.success(f"{len(uploaded_resume)} resume(s) uploaded successfully!")
 
 # Main content area
@@ -137,29 +351,27 @@ if st.session_state.show_tab == "dashboard":
     st.title("Dashboard")
     
     # Top metrics
-    results = load_results()
+    summary = summarize_results()
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Companies", len(results))
+        st.metric("Companies", summary["companies"])
     
     with col2:
-        successful = sum(1 for r in results if r.get("status") in ["success", "partial"])
+        successful = summary["successful"]
         st.metric("Successful Companies", successful)
     
     with col3:
-        contacts = sum(r.get("contacts_processed", 0) for r in results)
-        st.metric("Total Contacts", contacts)
+        st.metric("Total Contacts", summary["contacts"])
     
     with col4:
-        emails_sent = sum(r.get("contacts_successful", 0) for r in results)
-        st.metric("Emails Sent", emails_sent)
+        st.metric("Emails Sent", summary["emails_sent"])
     
     # Progress bar
-    if results:
+    if summary["companies"]:
         st.subheader("Overall Progress")
-        progress_pct = successful / len(results) if len(results) > 0 else 0
+        progress_pct = successful / summary["companies"]
         st.progress(progress_pct)
         st.caption(f"{progress_pct:.1%} Complete")
     
@@ -169,21 +381,8 @@ if st.session_state.show_tab == "dashboard":
     col1, col2 = st.columns(2)
     
     with col1:
-        if results:
-            status_counts = {}
-            for r in results:
-                status = r.get("status", "unknown")
-                status_counts[status] = status_counts.get(status, 0) + 1
-            
-            fig, ax = plt.subplots(figsize=(5, 5))
-            ax.pie(
-                status_counts.values(), 
-                labels=status_counts.keys(), 
-                autopct='%1.1f%%',
-                colors=['#4CAF50', '#FFC107', '#F44336', '#9C27B0']
-            )
-            ax.set_title("Company Status")
-            st.pyplot(fig)
+        if summary["companies"]:
+            st.image(_status_pie_png(tuple(summary["status_counts"].items())))
         else:
             st.info("No data available yet")
     
@@ -193,8 +392,7 @@ if st.session_state.show_tab == "dashboard":
             st.success("Outreach process is running")
             
             # Read the last few lines of the progress file
-            progress_text = load_progress()
-            last_lines = "\n".join(progress_text.split("\n")[-10:])
+            last_lines = tail_progress(10)
             st.text_area("Recent Progress", last_lines, height=200)
         else:
             st.subheader("Process Status")
@@ -209,26 +407,17 @@ elif st.session_state.show_tab == "companies":
     
     if results:
         # Convert to DataFrame for display
-        df = pd.DataFrame(results)
+        df = load_results_frame()
         
         # Clean up columns
         display_columns = ["company", "status", "contacts_processed", "contacts_successful"]
-        display_df = df[display_columns].copy() if all(col in df.columns for col in display_columns) else df
-        
-        # Add color coding
-        def color_status(val):
-            if val == "success":
-                return "background-color: #d4edda"
-            elif val == "partial":
-                return "background-color: #fff3cd"
-            elif val == "failed":
-                return "background-color: #f8d7da"
-            else:
-                return ""
+        display_df = df[display_columns].copy() if set(display_columns).issubset(df.columns) else df
         
-        # Show the styled dataframe
+        # Show the dataframe with the status column colour-coded in one go
+        table_df = display_df.assign(status=_status_badges(display_df["status"])) if "status" in display_df else display_df
         st.dataframe(
-            display_df.style.applymap(color_status, subset=["status"]),
+            table_df,
+            column_config=RESULTS_COLUMN_CONFIG,
             use_container_width=True,
             height=400
         )
@@ -247,14 +436,14 @@ elif st.session_state.show_tab == "companies":
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    st.json(company_data)
+                    st.code(_pretty_json(company_data), language="json")
                 
                 with col2:
                     st.subheader("Contact Results")
                     if "contact_results" in company_data:
                         for idx, contact in enumerate(company_data["contact_results"]):
                             with st.expander(f"Contact {idx+1}: {contact.get('contact', {}).get('name', 'Unknown')}"):
-                                st.json(contact)
+                                st.code(_pretty_json(contact), language="json")
     else:
         st.info("No company data available yet")
 
@@ -263,26 +452,11 @@ elif st.session_state.show_tab == "contacts":
     st.title("All Contacts")
     
     # Get all contact data from individual files
-    contacts_dir = RESULTS_DIR / "contacts"
-    all_contacts = []
-    
-    if contacts_dir.exists():
-        contact_files = list(contacts_dir.glob("*.json"))
-        
-        for file in contact_files:
-            try:
-                with open(file, "r") as f:
-                    data = json.load(f)
-                    if "key_contacts" in data:
-                        company_name = data.get("company", file.stem)
-                        for contact in data["key_contacts"]:
-                            contact["company"] = company_name
-                            all_contacts.append(contact)
-            except:
-                pass
+    all_contacts = load_contacts()
     
     if all_contacts:
         # Convert to DataFrame
+        import pandas as pd
         contacts_df = pd.DataFrame(all_contacts)
         
         # Show table
@@ -290,7 +464,7 @@ elif st.session_state.show_tab == "contacts":
         
         # Export option
         if st.button("Export Contacts CSV"):
-            csv = contacts_df.to_csv(index=False)
+            csv = _to_csv(contacts_df)
             st.download_button(
                 "Download CSV",
                 csv,
@@ -306,33 +480,39 @@ elif st.session_state.show_tab == "emails":
     st.title("Sent Emails")
     
     # Get all email data from individual files
-    emails_dir = RESULTS_DIR / "emails"
     all_emails = []
     
-    if emails_dir.exists() and emails_dir.is_dir():
-        email_files = list(emails_dir.glob("*.json"))
-        
-        for file in email_files:
-            try:
-                with open(file, "r") as f:
-                    data = json.load(f)
-                    data["filename"] = file.stem
-                    all_emails.append(data)
-            except:
-                pass
+    for entry in _json_entries(RESULTS_DIR / "emails"):
+        try:
+            data = orjson.loads(Path(entry.path).read_bytes())
+            data["filename"] = entry.name[:-len(".json")]
+            all_emails.append(data)
+        except:
+            pass
     
     if all_emails:
-        # Show email list
-        for idx, email in enumerate(all_emails):
-            with st.expander(f"Email {idx+1}: {email.get('subject', 'No Subject')}"):
-                st.write(f"**To:** {email.get('to', 'Unknown')}")
-                st.write(f"**Subject:** {email.get('subject', 'No Subject')}")
-                st.write(f"**Resume:** {email.get('resume', 'None')}")
-                st.write(f"**Status:** {email.get('status', 'Unknown')}")
-                st.write(f"**Sent at:** {email.get('timestamp', 'Unknown')}")
-                
-                st.write("**Body:**")
-                st.text_area("", email.get("body", ""), height=200, key=f"email_body_{idx}")
+        # Show the email list as one table instead of a widget per email
+        import pandas as pd
+        email_columns = ["subject", "to", "status", "timestamp"]
+        emails_df = pd.DataFrame(all_emails).reindex(columns=email_columns)
+        st.dataframe(emails_df, use_container_width=True, height=400)
+        
+        # Email details section - only the selected email's body is rendered
+        st.subheader("Email Details")
+        selected_idx = st.selectbox(
+            "Select an email to view",
+            options=range(len(all_emails)),
+            format_func=lambda idx: f"Email {idx+1}: {all_emails[idx].get('subject', 'No Subject')}"
+        )
+        email = all_emails[selected_idx]
+        st.write(f"**To:** {email.get('to', 'Unknown')}")
+        st.write(f"**Subject:** {email.get('subject', 'No Subject')}")
+        st.write(f"**Resume:** {email.get('resume', 'None')}")
+        st.write(f"**Status:** {email.get('status', 'Unknown')}")
+        st.write(f"**Sent at:** {email.get('timestamp', 'Unknown')}")
+        
+        st.write("**Body:**")
+        st.text_area("", email.get("body", ""), height=200, key="email_body")
     else:
         st.info("No emails sent yet")
 
@@ -355,23 +535,18 @@ elif st.session_state.show_tab == "logs":
     if st.session_state.process_running and st.session_state.process:
         st.subheader("Live Process Output")
         
-        output_container = st.empty()
-        
-        # Read output lines from subprocess
-        while st.session_state.process.poll() is None:
-            line = st.session_state.process.stdout.readline()
-            if line:
-                st.session_state.output_lines.append(line.strip())
-                output_container.text_area(
-                    "Output", 
-                    "\n".join(st.session_state.output_lines[-100:]),
-                    height=400
-                )
-            time.sleep(0.1)
+        # Show what the background reader has collected so far. list() copies the bounded deque
+        # in one step; iterating it directly could race with the reader thread's appends
+        output_lines = list(st.session_state.output_lines)
+        st.text_area("Output", "\n".join(output_lines[-100:]), height=400)
         
-        # Process has completed
-        st.session_state.process_running = False
-        st.success("Process completed")
+        if st.session_state.process.poll() is None:
+            if st.button("Refresh Output"):
+                st.experimental_rerun()
+        else:
+            # Process has completed
+            st.session_state.process_running = False
+            st.success("Process completed")
 
 elif st.session_state.show_tab == "settings":
     # Settings Tab
@@ -420,9 +595,10 @@ elif st.session_state.show_tab == "settings":
             if email_password != "*********":
                 env_content.append(f"EMAIL_PASSWORD={email_password}")
             
-            # Write to .env file
-            with open(".env", "w") as f:
-                f.write("\n".join(env_content))
+            # Write to .env file - via a temp file and rename, so a crash can't leave it half-written
+            tmp_env = Path(".env.tmp")
+            tmp_env.write_text("\n".join(env_content) + "\n")
+            tmp_env.replace(".env")
             
             st.success("Settings saved!")
     
@@ -434,11 +610,7 @@ elif st.session_state.show_tab == "settings":
         if test_email:
             with st.spinner("Testing connection..."):
                 try:
-                    # Import the send_email function
-                    sys.path.append(".")
-                    from outreach_ai.agents.send_email import send_email
-                    
-                    result = send_email(
+                    result = _send_email_fn()(
                         recipient_email=test_email,
                         subject="Test Email from Outreach AI",
                         body_text="This is a test email from your Outreach AI application.",
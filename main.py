@@ -3,13 +3,20 @@ from outreach_ai.agents.read_excel import read_company_data
 from outreach_ai.agents.find_ceo import find_key_contacts, parse_company_url
 from outreach_ai.agents.find_email import find_email
 from outreach_ai.agents.generate_email import generate_email
-from outreach_ai.agents.select_resume import select_resume
-from outreach_ai.agents.send_email import send_email
-import json
+from outreach_ai.agents.select_resume import select_resumes, website_keywords
+from outreach_ai.agents.send_email import SMTPPool, send_email
+import argparse
+import asyncio
+import orjson
 import os
 import logging
 import time
-import random
+import uuid
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 # Setup logging
@@ -26,47 +33,152 @@ os.makedirs("outreach_results/emails", exist_ok=True)
 EXCLUDED_LOCATIONS = os.getenv("EXCLUDED_LOCATIONS", "")
 if EXCLUDED_LOCATIONS:
     try:
-        EXCLUDED_LOCATIONS = json.loads(EXCLUDED_LOCATIONS)
+        EXCLUDED_LOCATIONS = orjson.loads(EXCLUDED_LOCATIONS)
     except:
         EXCLUDED_LOCATIONS = []
 else:
     # Default locations to exclude
     EXCLUDED_LOCATIONS = ["New York", "NY", "Midwest"]
     
+# Companies processed at the same time. LinkedIn lookups are paced by the bucket below,
+# and the email providers keep their own rate limits
+COMPANY_CONCURRENCY = int(os.getenv("OUTREACH_CONCURRENCY", "8"))
+
+# LinkedIn contact lookups: a burst of LINKEDIN_BURST, then one every LINKEDIN_INTERVAL seconds
+LINKEDIN_INTERVAL = float(os.getenv("LINKEDIN_INTERVAL", "30"))
+LINKEDIN_BURST = int(os.getenv("LINKEDIN_BURST", "5"))
+    
+# all_results.jsonl is appended per company; the all_results.json array is only rewritten this often
+RESULTS_SNAPSHOT_EVERY = 50
+    
+# Contacts at one company processed at the same time
+CONTACT_CONCURRENCY = 4
+
+# Generate the email while its address is still being looked up. Off by default: when the lookup
+# fails, the generation (a paid call on the OpenAI path) was wasted
+PREFETCH_EMAIL = os.getenv("OUTREACH_PREFETCH_EMAIL", "false").lower() == "true"
+    
 # Midwest states for filtering
 MIDWEST_STATES = ["Ohio", "Michigan", "Illinois", "Wisconsin", "Minnesota", 
                  "Indiana", "Iowa", "Missouri", "Kansas", "Nebraska", 
                  "South Dakota", "North Dakota"]
 
+# Every excluded token -> the reason it's excluded, compiled into one pattern so a location
+# is scanned once for all of them (earlier categories win when a token appears twice)
+_EXCLUSION_REASONS = {}
+for token in ("new york", "ny", "nyc", "manhattan", "brooklyn"):
+    _EXCLUSION_REASONS.setdefault(token, "New York")
+for token in ("midwest", *MIDWEST_STATES):
+    _EXCLUSION_REASONS.setdefault(token.lower(), "Midwest")
+for excluded in EXCLUDED_LOCATIONS:
+    _EXCLUSION_REASONS.setdefault(excluded.lower(), excluded)
+_EXCLUSION_RE = re.compile("|".join(re.escape(token) for token in sorted(_EXCLUSION_REASONS, key=len, reverse=True)))
+
+@lru_cache(maxsize=4096)
+def location_exclusion(location):
+    """Why a location is excluded ("New York", "Midwest" or the matching excluded location), or None"""
+    match = _EXCLUSION_RE.search(location.lower())
+    return _EXCLUSION_REASONS[match.group()] if match else None
+
+def normalize_company(company_data):
+    """Give a spreadsheet record its canonical keys once ("location" -> "Location"), so later steps need no fallbacks"""
+    if "Location" not in company_data and "location" in company_data:
+        company_data["Location"] = company_data.pop("location")
+    return company_data
+
 def should_skip_company(company_data):
-    """Check if company should be skipped based on location or other criteria"""
+    """Check if company should be skipped based on location or other criteria (expects a normalize_company record)"""
     # Skip if no location info
-    if "Location" not in company_data and "location" not in company_data:
+    location = company_data.get("Location")
+    if not location:
+        return False
+    
+    # Same locations repeat across the spreadsheet, so the matching is cached per location string
+    reason = location_exclusion(location)
+    if reason is None:
         return False
     
-    # Get location (case insensitive)
-    location = company_data.get("Location", company_data.get("location", "")).lower()
+    if reason in ("New York", "Midwest"):
+        logger.info(f"Skipping {reason} company: {company_data.get('Company Name')}")
+    else:
+        logger.info(f"Skipping company in {reason}: {company_data.get('Company Name')}")
+    return True
+
+class TokenBucket:
+    """Thread-safe token bucket: consume() only waits when the recent rate exceeds the limit"""
+    
+    def __init__(self, rate, capacity):
+        self.rate = rate  # tokens added per second
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._last_update = time.monotonic()
+        self._lock = threading.Lock()
     
-    # Skip New York companies
-    if any(loc.lower() in location for loc in ["new york", "ny", "nyc", "manhattan", "brooklyn"]):
-        logger.info(f"Skipping New York company: {company_data.get('Company Name')}")
-        return True
+    def _try_consume(self):
+        """Take a token; returns 0, or how long to wait before trying again"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self._last_update) * self.rate)
+            self._last_update = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
     
-    # Skip Midwest companies
-    if "midwest" in location or any(state.lower() in location for state in MIDWEST_STATES):
-        logger.info(f"Skipping Midwest company: {company_data.get('Company Name')}")
-        return True
+    def consume(self):
+        """Block until a token is available"""
+        while (delay := self._try_consume()):
+            time.sleep(delay)
+
+linkedin_bucket = TokenBucket(rate=1 / LINKEDIN_INTERVAL, capacity=LINKEDIN_BURST)
+
+@lru_cache(maxsize=1)
+def _json_write_queue():
+    """Queue of (path, bytes) drained by one background writer thread, started on first use"""
+    write_queue = queue.Queue()
     
-    # Skip other excluded locations
-    for excluded in EXCLUDED_LOCATIONS:
-        if excluded.lower() in location:
-            logger.info(f"Skipping company in {excluded}: {company_data.get('Company Name')}")
-            return True
+    def drain():
+        while True:
+            path, data = write_queue.get()
+            try:
+                with open(path, "wb") as f:
+                    f.write(data)
+            except OSError as e:
+                logger.error(f"Could not write {path}: {str(e)}")
+            finally:
+                write_queue.task_done()
     
-    return False
+    threading.Thread(target=drain, name="json-writer", daemon=True).start()
+    return write_queue
+
+def write_json_later(path, data):
+    """Save data as a JSON file on the background writer thread, so workers don't wait on disk"""
+    _json_write_queue().put((path, orjson.dumps(data, option=orjson.OPT_INDENT_2)))
+
+def flush_json_writes():
+    """Wait until every queued JSON file has been written"""
+    _json_write_queue().join()
+
+# Characters that can't appear in result file names, mapped to "_" in one translate() pass
+_SAFE_FILENAME_TABLE = str.maketrans({" ": "_", "/": "_", "\\": "_"})
+
+def safe_filename(name):
+    """Name with spaces and path separators replaced, for use as a file name"""
+    return name.translate(_SAFE_FILENAME_TABLE)
 
-def process_contact(company_data, contact_data):
-    """Process outreach to a single contact"""
+_DOMAIN_RE = re.compile(r'^(?:https?://)?(?:www\.)?([^/]*)', re.I)
+
+@lru_cache(maxsize=1024)
+def extract_domain(website):
+    """Bare domain of a company website ("https://www.example.com/about" -> "example.com")"""
+    return _DOMAIN_RE.match(website).group(1) if website else ""
+
+def prepare_contact(company_data, contact_data):
+    """Find a contact's address and write their email - everything before resume selection
+    
+    Returns (result, draft): a final result if the contact can't be emailed, otherwise None and
+    the draft that send_contact finishes once a resume has been picked.
+    """
     try:
         company_name = company_data["Company Name"]
         website = company_data.get("Website", "")
@@ -76,16 +188,38 @@ def process_contact(company_data, contact_data):
         
         logger.info(f"Processing contact: {contact_name} ({contact_title}) at {company_name}")
         
-        # Extract domain from website if needed
-        company_domain = website
-        if website.startswith("http"):
-            company_domain = website.split("//")[1].split("/")[0]
-        if company_domain.startswith("www."):
-            company_domain = company_domain[4:]
+        company_domain = extract_domain(website)
+        
+        # Adjust approach based on contact category
+        role_hint = None
+        if contact_category == "data_ai":
+            role_hint = "data science"
+        elif contact_category == "recruiting":
+            role_hint = "recruiting"
         
-        # Find email address
+        # The email text and the website analysis for resume selection don't depend on the address,
+        # so they run side by side once it is found - or, with PREFETCH_EMAIL, while it is looked up
         logger.info(f"Finding email address for {contact_name} at {company_domain}...")
-        email_result = find_email(contact_name, company_domain)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            def start_email_work():
+                company_keywords_future = executor.submit(website_keywords, website) if website else None
+                email_content_future = executor.submit(
+                    generate_email,
+                    recipient_name=contact_name,
+                    company_name=company_name,
+                    industry=company_data.get("Industry", ""),
+                    company_description=company_data.get("Description", ""),
+                    contact_role=contact_category
+                )
+                return company_keywords_future, email_content_future
+            
+            prefetched = start_email_work() if PREFETCH_EMAIL else None
+            email_result = find_email(contact_name, company_domain)
+            if email_result.get("success"):
+                logger.info(f"Generating personalized email for {contact_name}...")
+                company_keywords_future, email_content_future = prefetched or start_email_work()
+                email_content = email_content_future.result()
+                company_keywords = company_keywords_future.result() if company_keywords_future else []
         
         if not email_result.get("success"):
             logger.error(f"Could not find email: {email_result.get('error', 'Unknown error')}")
@@ -94,29 +228,11 @@ def process_contact(company_data, contact_data):
                 "contact": contact_name,
                 "status": "email_failed",
                 "error": email_result.get("error", "Email finding failed")
-            }
+            }, None
         
         contact_email = email_result.get("most_likely_email")
         logger.info(f"Found email: {contact_email}")
         
-        # Generate personalized email based on role
-        logger.info("Generating personalized email...")
-        
-        # Adjust approach based on contact category
-        role_hint = None
-        if contact_category == "data_ai":
-            role_hint = "data science"
-        elif contact_category == "recruiting":
-            role_hint = "recruiting"
-            
-        email_content = generate_email(
-            recipient_name=contact_name,
-            company_name=company_name,
-            industry=company_data.get("Industry", ""),
-            company_description=company_data.get("Description", ""),
-            contact_role=contact_category
-        )
-        
         if not email_content.get("success"):
             logger.error(f"Could not generate email: {email_content.get('error', 'Unknown error')}")
             return {
@@ -125,23 +241,47 @@ def process_contact(company_data, contact_data):
                 "email": contact_email,
                 "status": "email_generation_failed",
                 "error": "Email generation failed"
+            }, None
+        
+        return None, {
+            "company_data": company_data,
+            "contact_data": contact_data,
+            "contact_email": contact_email,
+            "email_content": email_content,
+            # select_resumes keyword arguments for this contact
+            "resume_lead": {
+                "company_name": company_name,
+                "company_website": website,
+                "ceo_name": contact_name,
+                "email_content": email_content.get("body", ""),
+                "role_hint": role_hint,
+                "company_keywords": company_keywords
             }
+        }
         
-        # Select best resume based on contact role
-        logger.info(f"Selecting best resume for {contact_category} role...")
-        resume_path, confidence = select_resume(
-            company_name=company_name,
-            company_website=website,
-            ceo_name=contact_name,
-            email_content=email_content.get("body", ""),
-            role_hint=role_hint
-        )
+    except Exception as e:
+        return contact_error(company_data, contact_data, e), None
+
+def send_contact(draft, resume_path, confidence, smtp_pool=None):
+    """Send a prepared email with its selected resume attached and record it
+    
+    Pass an SMTPPool to reuse a logged-in SMTP connection instead of opening one per email.
+    """
+    company_data, contact_data = draft["company_data"], draft["contact_data"]
+    try:
+        company_name = company_data["Company Name"]
+        contact_name = contact_data["name"]
+        contact_title = contact_data["title"]
+        contact_category = contact_data.get("category", "other")
+        contact_email = draft["contact_email"]
+        email_content = draft["email_content"]
         
         logger.info(f"Selected resume: {os.path.basename(resume_path)} with confidence {confidence}")
         
         # Send email with resume
         logger.info(f"Sending email to {contact_email}...")
-        send_result = send_email(
+        send = smtp_pool.send if smtp_pool is not None else send_email
+        send_result = send(
             recipient_email=contact_email,
             subject=email_content.get("subject", f"Interested in {company_name}"),
             body_text=email_content.get("body", ""),
@@ -161,9 +301,8 @@ def process_contact(company_data, contact_data):
         }
         
         # Create safe filename
-        safe_name = f"{company_name}_{contact_name}".replace(' ', '_').replace('/', '_').replace('\\', '_')
-        with open(f"outreach_results/emails/{safe_name}.json", "w") as f:
-            json.dump(email_record, f, indent=2)
+        safe_name = safe_filename(f"{company_name}_{contact_name}")
+        write_json_later(f"outreach_results/emails/{safe_name}.json", email_record)
         
         # Return result
         return {
@@ -181,28 +320,31 @@ def process_contact(company_data, contact_data):
         }
         
     except Exception as e:
-        logger.error(f"Error processing contact {contact_data.get('name', 'unknown')}: {str(e)}")
-        return {
-            "company": company_data.get("Company Name", "unknown"),
-            "contact": contact_data.get("name", "unknown"),
-            "status": "error",
-            "error": str(e)
-        }
+        return contact_error(company_data, contact_data, e)
+
+def contact_error(company_data, contact_data, error):
+    """Log a contact that failed with an exception, and build its result"""
+    logger.error(f"Error processing contact {contact_data.get('name', 'unknown')}: {str(error)}")
+    return {
+        "company": company_data.get("Company Name", "unknown"),
+        "contact": contact_data.get("name", "unknown"),
+        "status": "error",
+        "error": str(error)
+    }
+
+def skipped_result(company_data):
+    """Result for a company excluded by should_skip_company"""
+    return {
+        "company": company_data.get("Company Name", "unknown"),
+        "status": "skipped",
+        "reason": "location_filtered",
+        "location": company_data.get("Location", "unknown")
+    }
 
-def process_company(company_data):
-    """Process a single company through the full outreach workflow"""
+def process_company(company_data, smtp_pool=None):
+    """Process a single company through the full outreach workflow (location filtering happens before, in main)"""
     try:
         company_name = company_data["Company Name"]
-        
-        # Check if company should be skipped based on location
-        if should_skip_company(company_data):
-            return {
-                "company": company_name,
-                "status": "skipped",
-                "reason": "location_filtered",
-                "location": company_data.get("Location", company_data.get("location", "unknown"))
-            }
-            
         linkedin_url = company_data["LinkedIn URL"]
         
         if not linkedin_url:
@@ -222,6 +364,7 @@ def process_company(company_data):
         # Normalize LinkedIn URL
         linkedin_url = parse_company_url(linkedin_url)
         
+        linkedin_bucket.consume()
         contacts_result = find_key_contacts(linkedin_url)
         
         if "error" in contacts_result:
@@ -246,28 +389,38 @@ def process_company(company_data):
         logger.info(f"Found {len(key_contacts)} contacts")
         
         # Save contacts for this company
-        safe_name = company_name.replace(' ', '_').replace('/', '_').replace('\\', '_')
+        safe_name = safe_filename(company_name)
         contacts_file = f"outreach_results/contacts/{safe_name}.json"
         
-        with open(contacts_file, "w") as f:
-            json.dump({
-                "company": company_name,
-                "linkedin_url": linkedin_url,
-                "key_contacts": key_contacts
-            }, f, indent=2)
-        
-        # Step 2: Process each contact (find email, generate email, select resume, send)
-        contact_results = []
-        
-        for contact in key_contacts:
-            # Add a small delay between contacts at the same company
-            if contact_results:  # Not the first contact
-                delay = random.uniform(2, 5)  # 2-5 seconds
-                logger.info(f"Waiting {delay:.1f} seconds before next contact...")
-                time.sleep(delay)
-                
-            contact_result = process_contact(company_data, contact)
-            contact_results.append(contact_result)
+        write_json_later(contacts_file, {
+            "company": company_name,
+            "linkedin_url": linkedin_url,
+            "key_contacts": key_contacts
+        })
+        
+        # Step 2: Process the contacts concurrently (find email, generate email), pick the resumes for
+        # all of them with one LLM request, then send concurrently; the email and LLM providers are
+        # paced by their own rate limiters
+        with ThreadPoolExecutor(max_workers=min(len(key_contacts), CONTACT_CONCURRENCY)) as executor:
+            prepared = list(executor.map(lambda contact: prepare_contact(company_data, contact), key_contacts))
+            contact_results = [result for result, _ in prepared]
+            drafts = [(i, draft) for i, (_, draft) in enumerate(prepared) if draft is not None]
+            
+            if drafts:
+                logger.info(f"Selecting best resumes for {len(drafts)} contacts...")
+                try:
+                    resumes = select_resumes([draft["resume_lead"] for _, draft in drafts])
+                except Exception as e:
+                    resumes = None
+                    for i, draft in drafts:
+                        contact_results[i] = contact_error(company_data, draft["contact_data"], e)
+                if resumes is not None:
+                    sent = executor.map(
+                        lambda draft, resume: send_contact(draft, *resume, smtp_pool),
+                        [draft for _, draft in drafts], resumes
+                    )
+                    for (i, _), result in zip(drafts, sent):
+                        contact_results[i] = result
         
         # Step 3: Compile results
         success_count = sum(1 for r in contact_results if r.get("status") == "sent")
@@ -286,8 +439,7 @@ def process_company(company_data):
         }
         
         # Save individual company result
-        with open(f"outreach_results/{safe_name}_result.json", "w") as f:
-            json.dump(company_result, f, indent=2)
+        write_json_later(f"outreach_results/{safe_name}_result.json", company_result)
             
         return company_result
         
@@ -299,7 +451,70 @@ def process_company(company_data):
             "error": str(e)
         }
 
-def main():
+def record_result(progress_file, results_file, company_name, result, position):
+    """Log a finished company to the progress file and the results log
+    
+    `position` is the company's row in the spreadsheet; the log is in completion order,
+    so readers sort by it.
+    """
+    lines = [f"Finished {company_name} with status: {result.get('status')}\n"]
+    if result.get("status") == "skipped":
+        lines.append(f"Reason: {result.get('reason')} - {result.get('location')}\n")
+    if result.get('contacts_processed'):
+        lines.append(f"Contacts processed: {result.get('contacts_processed')}\n")
+    if result.get('contacts_successful'):
+        lines.append(f"Successful contacts: {result.get('contacts_successful')}\n")
+    if result.get('error'):
+        lines.append(f"Error: {result.get('error')}\n")
+    lines.append("---\n")
+    progress_file.write("".join(lines))
+    
+    # Append this company's result to the results log
+    results_file.write(orjson.dumps({**result, "position": position}).decode() + "\n")
+
+def write_results_snapshot(results):
+    """Atomically replace all_results.json with the results so far, as one JSON array"""
+    tmp_path = "outreach_results/all_results.json.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, "outreach_results/all_results.json")
+
+async def process_companies(companies, progress_file, results_file, concurrency=COMPANY_CONCURRENCY, smtp_pool=None,
+                            positions=None):
+    """Run process_company for every company, up to `concurrency` at a time.
+    
+    `positions` gives each company's spreadsheet row for the results log (default: its index).
+    
+    The workflow itself is blocking (browser, SMTP, LLM calls), so each company runs on a
+    worker thread; results are logged as they finish, but returned (and snapshotted) in input
+    order. The progress and results files are only written from the event loop, so they can
+    be shared open files.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    results = [None] * len(companies)
+    positions = positions if positions is not None else range(len(companies))
+    finished_count = 0
+    
+    async def run(i, company):
+        nonlocal finished_count
+        company_name = company.get('Company Name', f"Company {i+1}")
+        async with semaphore:
+            logger.info(f"Processing company {i+1}/{len(companies)}: {company_name}")
+            progress_file.write(f"Starting {company_name} at {time.strftime('%H:%M:%S')}\n")
+            
+            result = await loop.run_in_executor(executor, process_company, company, smtp_pool)
+            record_result(progress_file, results_file, company_name, result, positions[i])
+            results[i] = result
+            finished_count += 1
+            if finished_count % RESULTS_SNAPSHOT_EVERY == 0:
+                write_results_snapshot([r for r in results if r is not None])
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        await asyncio.gather(*(run(i, company) for i, company in enumerate(companies)))
+    return results
+
+def main(concurrency=COMPANY_CONCURRENCY):
     try:
         # Get the path to the Excel file
         script_dir = Path(__file__).parent
@@ -319,62 +534,49 @@ def main():
         logger.info(f"Reading companies from: {excel_path}")
         
         # Get list of companies from Excel
-        companies = read_company_data(str(excel_path))
+        companies = [normalize_company(company) for company in read_company_data(str(excel_path))]
         logger.info(f"Found {len(companies)} companies in Excel file")
         
         # Log excluded locations
         logger.info(f"Excluded locations: {EXCLUDED_LOCATIONS}")
         
-        # Create/reset progress tracking files
-        with open("outreach_results/progress.txt", "w") as progress_file:
+        # Results are appended one JSON object per line as each company finishes, after a
+        # header line with this run's id, which tells readers a new run has started
+        try:
+            os.remove("outreach_results/all_results.jsonl")
+        except FileNotFoundError:
+            pass
+        
+        # Both tracking files stay open for the whole run; line buffering keeps them readable
+        # by the dashboard as each line is written
+        with open("outreach_results/progress.txt", "w", buffering=1) as progress_file, \
+                open("outreach_results/all_results.jsonl", "a", buffering=1) as results_file:
+            results_file.write(orjson.dumps({"run_id": uuid.uuid4().hex}).decode() + "\n")
             progress_file.write(f"Starting outreach to {len(companies)} companies at {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
             progress_file.write(f"Excluded locations: {', '.join(EXCLUDED_LOCATIONS)}\n\n")
-        
-        with open("outreach_results/all_results.json", "w") as f:
-            json.dump([], f)
-        
-        # Process each company
-        all_results = []
-        skipped_count = 0
-        
-        for i, company in enumerate(companies):
-            company_name = company.get('Company Name', f"Company {i+1}")
-            logger.info(f"Processing company {i+1}/{len(companies)}: {company_name}")
-            
-            # Update progress file
-            with open("outreach_results/progress.txt", "a") as progress_file:
-                progress_file.write(f"Starting {company_name} at {time.strftime('%H:%M:%S')}\n")
             
-            # Process the company
-            result = process_company(company)
-            all_results.append(result)
-            
-            # Count skipped companies
-            if result.get("status") == "skipped":
-                skipped_count += 1
-            
-            # Update progress file
-            with open("outreach_results/progress.txt", "a") as progress_file:
-                progress_file.write(f"Finished {company_name} with status: {result.get('status')}\n")
-                if result.get("status") == "skipped":
-                    progress_file.write(f"Reason: {result.get('reason')} - {result.get('location')}\n")
-                if result.get('contacts_processed'):
-                    progress_file.write(f"Contacts processed: {result.get('contacts_processed')}\n")
-                if result.get('contacts_successful'):
-                    progress_file.write(f"Successful contacts: {result.get('contacts_successful')}\n")
-                if result.get('error'):
-                    progress_file.write(f"Error: {result.get('error')}\n")
-                progress_file.write("---\n")
-            
-            # Save all results so far
-            with open("outreach_results/all_results.json", "w") as f:
-                json.dump(all_results, f, indent=2)
+            # Filter out excluded locations before any network work, so the pool only gets real work.
+            # Each result goes in its company's slot, so all_results keeps the spreadsheet order
+            all_results = [None] * len(companies)
+            to_process = []
+            to_process_positions = []
+            for position, company in enumerate(companies):
+                if should_skip_company(company):
+                    all_results[position] = skipped_result(company)
+                    record_result(progress_file, results_file, all_results[position]["company"], all_results[position], position)
+                else:
+                    to_process.append(company)
+                    to_process_positions.append(position)
+            logger.info(f"Skipping {len(companies) - len(to_process)} companies in excluded locations, processing {len(to_process)}")
             
-            # Pause between companies to avoid rate limits
-            if i < len(companies) - 1:
-                delay = random.uniform(30, 60)  # 30-60 seconds
-                logger.info(f"Pausing for {delay:.1f} seconds before next company...")
-                time.sleep(delay)
+            # Process the companies, several at a time, sending over pooled SMTP connections
+            with SMTPPool() as smtp_pool:
+                processed_results = asyncio.run(process_companies(to_process, progress_file, results_file, concurrency, smtp_pool,
+                                                                 positions=to_process_positions))
+            for position, result in zip(to_process_positions, processed_results):
+                all_results[position] = result
+        write_results_snapshot(all_results)
+        skipped_count = sum(1 for r in all_results if r.get("status") == "skipped")
         
         # Summarize results
         processed_companies = [r for r in all_results if r.get("status") != "skipped"]
@@ -392,32 +594,35 @@ def main():
         logger.info(f"Total contacts processed: {total_contacts}")
         logger.info(f"Successful contacts: {successful_contacts}")
         
+        # Build the summary in memory and write it in one go
+        lines = [
+            f"Outreach completed at {time.strftime('%Y-%m-%d %H:%M:%S')}\n",
+            f"Total companies: {len(companies)}\n",
+            f"Skipped companies: {skipped_count}\n",
+            f"Processed companies: {len(processed_companies)}\n",
+            f"Successful companies: {successful_companies}\n",
+            f"Failed companies: {failed_companies}\n",
+            f"Total contacts processed: {total_contacts}\n",
+            f"Successful contacts: {successful_contacts}\n\n",
+            "Excluded Locations:\n",
+        ]
+        lines.extend(f"- {location}\n" for location in EXCLUDED_LOCATIONS)
+        lines.append("\n")
+        
+        lines.append("Company Details:\n")
+        for result in all_results:
+            if result.get("status") == "skipped":
+                lines.append(f"- {result.get('company')}: SKIPPED ({result.get('location', '')})\n")
+            else:
+                lines.append(f"- {result.get('company')}: {result.get('status')}")
+                if result.get("contacts_processed"):
+                    lines.append(f" ({result.get('contacts_successful', 0)}/{result.get('contacts_processed', 0)} contacts)")
+                if result.get("error"):
+                    lines.append(f" (Error: {result.get('error')})")
+                lines.append("\n")
+        
         with open("outreach_results/summary.txt", "w") as f:
-            f.write(f"Outreach completed at {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total companies: {len(companies)}\n")
-            f.write(f"Skipped companies: {skipped_count}\n")
-            f.write(f"Processed companies: {len(processed_companies)}\n")
-            f.write(f"Successful companies: {successful_companies}\n")
-            f.write(f"Failed companies: {failed_companies}\n")
-            f.write(f"Total contacts processed: {total_contacts}\n")
-            f.write(f"Successful contacts: {successful_contacts}\n\n")
-            
-            f.write("Excluded Locations:\n")
-            for location in EXCLUDED_LOCATIONS:
-                f.write(f"- {location}\n")
-            f.write("\n")
-            
-            f.write("Company Details:\n")
-            for result in all_results:
-                if result.get("status") == "skipped":
-                    f.write(f"- {result.get('company')}: SKIPPED ({result.get('location', '')})\n")
-                else:
-                    f.write(f"- {result.get('company')}: {result.get('status')}")
-                    if result.get("contacts_processed"):
-                        f.write(f" ({result.get('contacts_successful', 0)}/{result.get('contacts_processed', 0)} contacts)")
-                    if result.get("error"):
-                        f.write(f" (Error: {result.get('error')})")
-                    f.write("\n")
+            f.write("".join(lines))
         
         return all_results
         
@@ -426,12 +631,17 @@ def main():
         # Take emergency backup of results so far
         emergency_file = f"outreach_results/emergency_backup_{time.strftime('%Y%m%d_%H%M%S')}.json"
         try:
-            with open(emergency_file, "w") as f:
-                json.dump({"error": str(e), "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')}, f)
+            with open(emergency_file, "wb") as f:
+                f.write(orjson.dumps({"error": str(e), "timestamp": time.strftime('%Y-%m-%d %H:%M:%S')}))
             logger.info(f"Emergency backup saved to {emergency_file}")
         except:
             pass
         return {"error": str(e)}
+    finally:
+        flush_json_writes()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the outreach workflow for every company in the spreadsheet")
+    parser.add_argument("--concurrency", type=int, default=COMPANY_CONCURRENCY, help="companies processed at the same time")
+    args = parser.parse_args()
+    main(concurrency=args.concurrency)
\ No newline at end of file
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from agents.select_resume import ResumeSelector
+
+RESUMES = [
+    Path("resumes/Spoorthi_Resume_Datascience.pdf"),
+    Path("resumes/Spoorthi_Resume_DE.pdf"),
+    Path("resumes/Spoorthi Veeresh.pdf"),
+]
+
+
+def scores(job_keywords):
+    return {path.name: score for path, score in ResumeSelector._filename_keyword_scores(RESUMES, job_keywords)}
+
+
+def test_multi_word_keyword_matches_joined_filename():
+    assert scores(["data science"])["Spoorthi_Resume_Datascience.pdf"] == 1
+
+
+def test_short_keyword_needs_whole_word():
+    result = scores(["de"])
+    assert result["Spoorthi_Resume_DE.pdf"] == 1
+    # "de" is inside "Datascience" but not a word of its own
+    assert result["Spoorthi_Resume_Datascience.pdf"] == 0
+
+
+def test_long_keyword_matches_substring():
+    assert scores(["veeresh"])["Spoorthi Veeresh.pdf"] == 1